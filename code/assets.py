@@ -0,0 +1,39 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from support import cache_frames
+
+
+class AssetRegistry:
+    # enemy frames are sliced the first time a wave needs them, upcoming waves are prefetched in the background
+    def __init__(self, loaders, dependencies=None):
+        self.loaders = loaders
+        self.dependencies = dependencies or {}
+        self.frames = {}
+        self.pending = {}
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='asset-prefetch')
+
+    def load(self, name):
+        frames = self.loaders[name]()
+        for animation, _ in frames.values():
+            cache_frames(animation)
+        return frames
+
+    def with_dependencies(self, names):
+        # a necromancer summons small skeletons, so it drags their frames in too
+        for name in dict.fromkeys(names):
+            yield name
+            yield from self.dependencies.get(name, ())
+
+    def get(self, name):
+        if name not in self.frames:
+            future = self.pending.pop(name, None)
+            self.frames[name] = future.result() if future else self.load(name)
+        return self.frames[name]
+
+    def prefetch(self, names):
+        for name in self.with_dependencies(names):
+            if name not in self.frames and name not in self.pending:
+                self.pending[name] = self.executor.submit(self.load, name)
+
+    def shutdown(self):
+        self.executor.shutdown(wait=True, cancel_futures=True)
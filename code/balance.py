@@ -0,0 +1,139 @@
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from statistics import mean
+
+import pygame
+
+from player import ScriptedKeys
+
+# usage (from the code directory, like main.py):
+# python balance.py --runs 500 --waves 10 --set Skeleton.damage=40,55,70 --set DemonSlime.health=800,1000
+
+
+class ChaserBot:
+    # walks up to the closest living enemy and swings at it, heavy attack whenever it is ready
+    def __init__(self, game):
+        self.game = game
+
+    def __call__(self):
+        player = self.game.player
+        targets = [enemy for enemy in self.game.enemy_sprites if not enemy.is_dead]
+        if not targets:
+            return ScriptedKeys()
+
+        target = min(targets, key=lambda enemy: (enemy.rect.centerx - player.rect.centerx) ** 2 +
+                                                 (enemy.rect.centery - player.rect.centery) ** 2)
+        distance_x = target.rect.centerx - player.rect.centerx
+        distance_y = target.rect.centery - player.rect.centery
+
+        pressed = set()
+        if abs(distance_x) > 60:
+            pressed.add(pygame.K_d if distance_x > 0 else pygame.K_a)
+        if abs(distance_y) > 40:
+            pressed.add(pygame.K_s if distance_y > 0 else pygame.K_w)
+        if abs(distance_x) < 150 and abs(distance_y) < 100:
+            pressed.add(pygame.K_f if player.can_attack['heavy'] else pygame.K_SPACE)
+        return ScriptedKeys(pressed)
+
+
+def run_seed(seed, overrides, waves, max_frames):
+    # one full headless game, runs inside a worker process
+    from game import Game
+    from support import clear_frame_caches
+
+    game = Game(headless=True, stat_overrides=overrides, seed=seed)
+    result = game.simulate(waves, keys=ChaserBot(game), max_frames=max_frames)
+    game.enemy_assets.shutdown()
+    # the next game in this worker loads its own frames
+    clear_frame_caches()
+    result['seed'] = seed
+    return result
+
+
+def parse_sweep(values):
+    # ["Skeleton.damage=40,55"] -> [{'Skeleton': {'damage': 40}}, {'Skeleton': {'damage': 55}}]
+    axes = []
+    for value in values:
+        stat, options = value.split('=')
+        enemy, attribute = stat.split('.')
+        axes.append([(enemy, attribute, json.loads(option)) for option in options.split(',')])
+
+    combinations = []
+    for combination in itertools.product(*axes):
+        overrides = {}
+        for enemy, attribute, option in combination:
+            overrides.setdefault(enemy, {})[attribute] = option
+        combinations.append(overrides)
+    return combinations
+
+
+def summarize(results):
+    deaths = [result['death_wave'] for result in results if result['player_dead']]
+    summary = {
+        'runs': len(results),
+        'death_rate': len(deaths) / len(results),
+        'mean_death_wave': mean(deaths) if deaths else None,
+        'waves': []
+    }
+
+    per_wave = {}
+    for result in results:
+        for wave in result['waves']:
+            per_wave.setdefault(wave['wave'], []).append(wave)
+    for number, waves in sorted(per_wave.items()):
+        cleared = [wave for wave in waves if wave['cleared']]
+        summary['waves'].append({
+            'wave': number,
+            'reached': len(waves),
+            'clear_rate': len(cleared) / len(waves),
+            'mean_clear_time': mean(wave['time'] for wave in cleared) if cleared else None,
+            'mean_damage_taken': mean(wave['damage_taken'] for wave in waves)
+        })
+    return summary
+
+
+def sweep(combinations, runs, waves, max_frames, workers, first_seed=0):
+    # every (combination, seed) pair is its own task, so all cores stay busy until the end
+    tasks = [(index, seed) for index in range(len(combinations)) for seed in range(first_seed, first_seed + runs)]
+    results = [[] for _ in combinations]
+
+    # spawn keeps SDL state out of the forked workers
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as executor:
+        futures = [(index, executor.submit(run_seed, seed, combinations[index], waves, max_frames))
+                   for index, seed in tasks]
+        for index, future in futures:
+            results[index].append(future.result())
+
+    return [{'overrides': overrides, **summarize(combination_results)}
+            for overrides, combination_results in zip(combinations, results)]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='simulate seeded headless wave runs across enemy stat variations')
+    parser.add_argument('--runs', type=int, default=100, help='seeded runs per stat combination')
+    parser.add_argument('--waves', type=int, help='stop after this many waves, all of them by default')
+    parser.add_argument('--max-frames', type=int, default=60 * 60 * 30, help='give up on a run after this many frames')
+    parser.add_argument('--set', action='append', default=[], metavar='ENEMY.STAT=V1,V2',
+                        help='stat values to sweep, may be repeated')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='worker processes, every core by default')
+    parser.add_argument('--seed', type=int, default=0, help='first seed')
+    parser.add_argument('--out', help='write the summary as json to this file')
+    args = parser.parse_args()
+
+    summaries = sweep(parse_sweep(args.set), args.runs, args.waves, args.max_frames, args.workers, args.seed)
+
+    for summary in summaries:
+        print(f"{summary['overrides'] or 'baseline'}: {summary['runs']} runs, death rate {summary['death_rate']:.0%}, "
+              f"mean death wave {summary['mean_death_wave']}")
+        for wave in summary['waves']:
+            clear_time = f"{wave['mean_clear_time']:.1f}s" if wave['mean_clear_time'] is not None else '-'
+            print(f"  wave {wave['wave']:>2}: reached {wave['reached']:>4}, cleared {wave['clear_rate']:.0%}, "
+                  f"clear time {clear_time}, damage taken {wave['mean_damage_taken']:.1f}")
+
+    if args.out:
+        with open(args.out, 'w') as file:
+            json.dump(summaries, file, indent=2)
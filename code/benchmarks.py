@@ -0,0 +1,225 @@
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from statistics import median, quantiles
+
+import pygame
+
+import support
+from player import ScriptedKeys
+
+# usage (from the code directory, like main.py):
+# python benchmarks.py                    run every scenario and compare with the stored baselines
+# python benchmarks.py --save-baseline    store this machine's numbers as the new baselines
+# python benchmarks.py goblin-horde       run only the named scenarios
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark_baselines.json')
+DT = 1 / 60
+
+
+def percentile_99(values):
+    return quantiles(values, n=100)[98] if len(values) > 1 else values[0]
+
+
+def new_game():
+    from game import Game
+
+    game = Game(headless=True, seed=0)
+    # a player that can't die keeps every scenario's workload the same length
+    game.player.max_health = game.player.health = 10 ** 9
+    # no wave logic, scenarios place their own enemies
+    game.game_started = True
+    game.wave_limit = 0
+    return game
+
+
+def close_game(game):
+    game.enemy_assets.shutdown()
+    support.clear_frame_caches()
+
+
+def spawn_around(game, name, count, radius):
+    for index in range(count):
+        enemy = game.spawn(game.archetypes[name])
+        offset = pygame.Vector2(radius * (0.5 + index % 3 / 4), 0).rotate(index * 360 / count)
+        enemy.rect.center = game.player.rect.center + offset
+        enemy.hitbox_rect.center = enemy.rect.center
+        if hasattr(enemy, 'starting_pos'):
+            enemy.starting_pos = enemy.rect.center
+        game.wave_enemies.add(enemy)
+
+
+def arena_start(game):
+    game.player.rect.center = (2500, 900)
+    game.player.hitbox_rect.center = game.player.rect.center
+
+
+def measure_frames(game, frames, keys=None, before_frame=None):
+    game.player.get_keys = keys or ScriptedKeys
+    phases = {'update': [], 'world_draw': [], 'ui_draw': [], 'display': [], 'frame': []}
+
+    for frame in range(frames):
+        if before_frame:
+            before_frame(frame)
+        start = time.perf_counter()
+        game.simulated_clock.advance(DT)
+        game.update(DT)
+        updated = time.perf_counter()
+        game.screen.fill(color='black')
+        game.all_sprites.draw(game.player.rect.center)
+        world_drawn = time.perf_counter()
+        game.ui.draw()
+        ui_drawn = time.perf_counter()
+        pygame.display.update()
+        end = time.perf_counter()
+
+        phases['update'].append((updated - start) * 1000)
+        phases['world_draw'].append((world_drawn - updated) * 1000)
+        phases['ui_draw'].append((ui_drawn - world_drawn) * 1000)
+        phases['display'].append((end - ui_drawn) * 1000)
+        phases['frame'].append((end - start) * 1000)
+    return phases
+
+
+# scenarios, each returns {phase: [milliseconds, ...]}
+def startup(cache_dir, runs):
+    # the later scenarios go back to the real atlas cache
+    atlas_cache_dir = support.ATLAS_CACHE_DIR
+    support.ATLAS_CACHE_DIR = cache_dir
+    times = []
+    try:
+        for _ in range(runs):
+            start = time.perf_counter()
+            game = new_game()
+            # every enemy's frames, not just the first wave's
+            for name in game.enemy_assets.loaders:
+                game.enemy_assets.get(name)
+            times.append((time.perf_counter() - start) * 1000)
+            close_game(game)
+    finally:
+        support.ATLAS_CACHE_DIR = atlas_cache_dir
+    return {'startup': times}
+
+
+def startup_cold(args):
+    times = []
+    for _ in range(args.startup_runs):
+        # an empty atlas cache every time
+        with tempfile.TemporaryDirectory() as cache_dir:
+            times += startup(cache_dir, 1)['startup']
+    return {'startup': times}
+
+
+def startup_warm(args):
+    with tempfile.TemporaryDirectory() as cache_dir:
+        startup(cache_dir, 1)
+        return startup(cache_dir, args.startup_runs)
+
+
+def goblin_horde(args):
+    game = new_game()
+    arena_start(game)
+    spawn_around(game, 'Goblin', 60, 500)
+    phases = measure_frames(game, args.frames, keys=lambda: ScriptedKeys([pygame.K_SPACE]))
+    close_game(game)
+    return phases
+
+
+def necromancer_lasers(args):
+    game = new_game()
+    arena_start(game)
+    spawn_around(game, 'Necromancer', 12, 300)
+    phases = measure_frames(game, args.frames)
+    close_game(game)
+    return phases
+
+
+def demon_slime_wave(args):
+    game = new_game()
+    arena_start(game)
+    spawn_around(game, 'DemonSlime', 3, 400)
+    phases = measure_frames(game, args.frames, keys=lambda: ScriptedKeys([pygame.K_f]))
+    close_game(game)
+    return phases
+
+
+def map_crossing(args):
+    # sweeps the camera over every row of the 110x40 map, walls and all
+    game = new_game()
+    left, top, right, bottom = 150, 50, 150 + 110 * 48, 50 + 40 * 48
+    rows = range(top, bottom, 450)
+    path = [(x, y) for y in rows for x in range(left, right, 40)]
+
+    def before_frame(frame):
+        game.player.rect.center = path[frame % len(path)]
+
+    phases = measure_frames(game, len(path), keys=lambda: ScriptedKeys([pygame.K_d]), before_frame=before_frame)
+    close_game(game)
+    return phases
+
+
+SCENARIOS = {
+    'startup-cold': startup_cold,
+    'startup-warm': startup_warm,
+    'goblin-horde': goblin_horde,
+    'necromancer-lasers': necromancer_lasers,
+    'demon-slime-wave': demon_slime_wave,
+    'map-crossing': map_crossing
+}
+
+
+def summarize(phases):
+    return {phase: {'median': median(values), 'p99': percentile_99(values)} for phase, values in phases.items()}
+
+
+def compare(results, baselines, tolerance):
+    # a phase regresses when its median or p99 is more than tolerance slower than the baseline
+    regressions = []
+    for scenario, phases in results.items():
+        for phase, stats in phases.items():
+            for stat, value in stats.items():
+                baseline = baselines.get(scenario, {}).get(phase, {}).get(stat)
+                if baseline and value > baseline * (1 + tolerance):
+                    regressions.append(f'{scenario} {phase} {stat}: {value:.2f}ms, baseline {baseline:.2f}ms')
+    return regressions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='frame loop and asset pipeline benchmarks')
+    parser.add_argument('scenarios', nargs='*', help=f'scenarios to run, all by default: {", ".join(SCENARIOS)}')
+    parser.add_argument('--frames', type=int, default=600, help='frames per gameplay scenario')
+    parser.add_argument('--startup-runs', type=int, default=3, help='games started per startup scenario')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='allowed slowdown against the baselines')
+    parser.add_argument('--baseline', default=BASELINE_PATH, help='baseline json file')
+    parser.add_argument('--save-baseline', action='store_true', help='store the results as the new baselines')
+    args = parser.parse_args()
+    unknown = [name for name in args.scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f'unknown scenarios: {", ".join(unknown)} (choose from {", ".join(SCENARIOS)})')
+
+    results = {}
+    for name in args.scenarios or SCENARIOS:
+        results[name] = summarize(SCENARIOS[name](args))
+        for phase, stats in results[name].items():
+            print(f"{name:<20} {phase:<12} median {stats['median']:8.2f}ms   p99 {stats['p99']:8.2f}ms")
+
+    if args.save_baseline:
+        baselines = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as file:
+                baselines = json.load(file)
+        baselines.update(results)
+        with open(args.baseline, 'w') as file:
+            json.dump(baselines, file, indent=2)
+        print(f'baselines saved to {args.baseline}')
+    elif os.path.exists(args.baseline):
+        with open(args.baseline) as file:
+            regressions = compare(results, json.load(file), args.tolerance)
+        for regression in regressions:
+            print(f'REGRESSION {regression}')
+        sys.exit(1 if regressions else 0)
+    else:
+        print('no baselines yet, run with --save-baseline to store these numbers')
@@ -0,0 +1,46 @@
+from support import collide_mask
+
+
+class Combat:
+    # every hit of a frame is resolved here, after everything has moved
+    # attackers only say when their strike is live (attack_active) and what landing it does (land_hit)
+    def __init__(self, player, enemy_sprites, player_attack_sprites, lasers):
+        self.player = player
+        self.enemy_sprites = enemy_sprites
+        self.player_attack_sprites = player_attack_sprites
+        self.lasers = lasers
+
+    def player_attacks(self, enemies):
+        for effect in self.player_attack_sprites:
+            if not effect.can_hit:
+                continue
+            # broadphase on rects, masks only for what overlaps
+            for enemy in effect.rect.collideobjectsall(enemies, key=lambda sprite: sprite.rect):
+                if not enemy.is_dead and collide_mask(enemy, effect):
+                    effect.attack(enemy)
+                    effect.can_hit = False
+                    effect.attack_cooldown_timer.activate()
+                    break
+
+    def enemy_attacks(self, enemies):
+        if self.player.is_dead:
+            return
+        attackers = [enemy for enemy in enemies if not enemy.is_dead and enemy.attack_active()]
+        attackers += [laser for laser in self.lasers if laser.attack_active()]
+        for attacker in self.player.rect.collideobjectsall(attackers, key=lambda sprite: sprite.rect):
+            if collide_mask(attacker, self.player):
+                attacker.land_hit()
+
+    def remove_dead(self, enemies):
+        # the dead only play out their death animation, they leave the groups that attacks and movement scan
+        for enemy in enemies:
+            if enemy.is_dead:
+                if not enemy.death_timer:
+                    enemy.death_timer.activate()
+                self.enemy_sprites.remove(enemy)
+
+    def update(self):
+        enemies = self.enemy_sprites.sprites()
+        self.player_attacks(enemies)
+        self.enemy_attacks(enemies)
+        self.remove_dead(enemies)
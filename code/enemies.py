@@ -1,19 +1,62 @@
-import random
+import json
 
 import pygame.draw
 from pygame import Vector2, FRect
 
 from settings import *
 from timers import Timer
-
-from random import choice, uniform
+from support import flip_frame, frame_mask, silhouette
+from resources import open_asset, load_image
+import rng
+
+
+class Archetype:
+    # one entry of enemies_info.json, shared by every enemy spawned from it
+    __slots__ = ('name', 'kind', 'frames', 'health', 'damage', 'speed', 'hitbox', 'death_time', 'animation_speed',
+                 'animation_speeds', 'cooldowns', 'attack_range', 'attack_frames', 'summons')
+
+    def __init__(self, name, data):
+        self.name = name
+        self.kind = data['class']
+        self.frames = data['frames']
+        self.health = data['health']
+        self.damage = data['damage']
+        self.speed = data['speed']
+        self.hitbox = tuple(data['hitbox'])
+        self.death_time = data['death-time']
+        self.animation_speed = data['animation-speed']
+        self.animation_speeds = data['animation-speeds']
+        self.cooldowns = data.get('cooldowns', {})
+        self.attack_range = data.get('attack-range')
+        self.attack_frames = data.get('attack-frames')
+        self.summons = data.get('summons')
+
+    def with_overrides(self, overrides):
+        # a copy with some stats changed, balance sweeps spawn from it instead of patching every enemy
+        unknown = set(overrides) - set(self.__slots__)
+        if unknown:
+            raise ValueError(f'{self.name} has no stat {", ".join(sorted(unknown))}')
+        archetype = Archetype.__new__(Archetype)
+        for name in self.__slots__:
+            setattr(archetype, name, overrides.get(name, getattr(self, name)))
+        return archetype
+
+
+def load_archetypes(path, stat_overrides=None):
+    # stat_overrides: name -> {stat: value}, the one table waves and summons both spawn from
+    stat_overrides = stat_overrides or {}
+    with open_asset(path) as json_file:
+        archetypes = {name: Archetype(name, data) for name, data in json.load(json_file)['enemies-data'].items()}
+    return {name: archetype.with_overrides(stat_overrides[name]) if name in stat_overrides else archetype
+            for name, archetype in archetypes.items()}
 
 
 # noinspection PyTypeChecker
 
 class Enemy(pygame.sprite.Sprite):
-    def __init__(self, pos, frames, player, player_sprites, collision_sprites, groups):
+    def __init__(self, pos, frames, player, player_sprites, collision_sprites, groups, archetype):
         super().__init__(groups)
+        self.archetype = archetype
         # general
         self.screen = pygame.display.get_surface()
         self.frames, self.frame_index = frames, 0
@@ -23,9 +66,10 @@ class Enemy(pygame.sprite.Sprite):
         # image
         self.image = self.frames[self.state][0][self.frame_index]
         self.rect = self.image.get_frect(center=pos)
+        self.hitbox_rect = self.rect.inflate(self.hitbox_value)
 
         # animations
-        self.animation_speed = 5
+        self.animation_speed = archetype.animation_speed
         self.animation_length = frames[self.state][1]
         self.flip = False
 
@@ -33,15 +77,54 @@ class Enemy(pygame.sprite.Sprite):
         self.player = player
         self.player_sprites = player_sprites
 
-        self.max_health = 50
-        self.health = None
-        self.damage = 1
+        self.health = archetype.health
 
         self.dodge = False
         self.is_dead = False
-        self.is_out = False
+        # chasers are stepped toward the player by EnemySprites.move_chasers while this is set
+        self.chasing = False
+        # set by EnemySprites.schedule_thinking, every step on screen, now and then off screen
+        self.think_due = True
+
+        self.death_timer = Timer(archetype.death_time, func=lambda: self.kill())
+
+    @classmethod
+    def spawn(cls, pos, frames, archetype, game):
+        return cls(pos, frames, game.player, game.player_sprites, game.collision_sprites,
+                   (game.all_sprites, game.enemy_sprites), archetype)
+
+    @property
+    def mask(self):
+        return frame_mask(self.image)
+
+    # stats that never change are read from the archetype, an enemy only keeps what does
+    @property
+    def hitbox_value(self):
+        return self.archetype.hitbox
+
+    @property
+    def max_health(self):
+        return self.archetype.health
+
+    @property
+    def damage(self):
+        return self.archetype.damage
+
+    @property
+    def speed(self):
+        return self.archetype.speed
+
+    # read by Combat once per frame, land_hit runs when attack_active and the masks overlap the player
+    def attack_active(self):
+        return False
 
-        self.death_timer = Timer(2000, func=lambda: self.kill())
+    def land_hit(self):
+        pass
+
+    def should_think(self):
+        # decisions (ranges, attacks, turns) only run on steps the scheduler picked, movement and animation always
+        due, self.think_due = self.think_due, False
+        return due
 
     def deal_damage(self):
         self.player.health -= self.damage
@@ -53,11 +136,10 @@ class Enemy(pygame.sprite.Sprite):
         self.animation_length = self.frames[self.state][1]
 
         if looped:
-            self.image = pygame.transform.flip(
-                self.frames[self.state][0][int(self.frame_index % self.animation_length)], self.flip, False)
+            self.image = flip_frame(self.frames[self.state][0][int(self.frame_index % self.animation_length)],
+                                    self.flip)
         else:
-            self.image = pygame.transform.flip(
-                self.frames[self.state][0][int(self.frame_index)], self.flip, False)
+            self.image = flip_frame(self.frames[self.state][0][int(self.frame_index)], self.flip)
             if self.frame_index > self.animation_length - 0.4 and func:
                 func()
 
@@ -68,6 +150,10 @@ class Enemy(pygame.sprite.Sprite):
             self.moving = False
             return True
 
+    def update_animation_speed(self):
+        # states the archetype has no speed for keep the last one
+        self.animation_speed = self.archetype.animation_speeds.get(self.state, self.animation_speed)
+
     def animate(self, dt):
         self.frame_index += self.animation_speed * dt
         self.image = self.frames[self.state][0][int(self.frame_index) % self.animation_length]
@@ -79,7 +165,7 @@ class Enemy(pygame.sprite.Sprite):
             self.flip = True
 
     def collisions(self, direction, rect):
-        for wall in self.walls:
+        for wall in self.walls.near(rect):
             if wall.rect.colliderect(rect):
                 if direction == 'horizontal':
                     if self.direction.x > 0:
@@ -97,29 +183,28 @@ class Enemy(pygame.sprite.Sprite):
 
 
 class Skeleton(Enemy):
-    def __init__(self, pos, frames, player, player_sprites, collision_sprites, groups):
-        super().__init__(pos, frames, player, player_sprites, collision_sprites, groups)
-        # override values
-        self.animation_speed = 10
-        self.max_health = 130
-        self.health = self.max_health
-        self.damage = 55
-        self.hitbox_value = (-100, -100)
-        self.hitbox_rect = self.rect.inflate(self.hitbox_value)
+    chase_offset = (0, 0)
 
-        self.speed = 200
+    def __init__(self, pos, frames, player, player_sprites, collision_sprites, groups, archetype):
+        super().__init__(pos, frames, player, player_sprites, collision_sprites, groups, archetype)
         self.direction = Vector2()
         self.moving = True
         self.can_attack = True
         self.can_hit = True
-        self.range = 70
-        self.attack_frames_values = [4, 10]
 
         # timers
-        self.damage_cooldown_timer = Timer(500, func=lambda: setattr(self, 'can_hit', True))
-        self.attack_cooldown_timer = Timer(1, func=lambda: (
+        self.damage_cooldown_timer = Timer(archetype.cooldowns['damage'], func=lambda: setattr(self, 'can_hit', True))
+        self.attack_cooldown_timer = Timer(archetype.cooldowns['attack'], func=lambda: (
             setattr(self, 'can_attack', True), setattr(self, 'moving', True)))
 
+    @property
+    def range(self):
+        return self.archetype.attack_range
+
+    @property
+    def attack_frames_values(self):
+        return self.archetype.attack_frames
+
     def check_if_in_range(self):
         if self.rect.y > self.player.rect.y:
             if (((0 < self.rect.centerx - self.player.rect.centerx < self.range) and self.can_attack) or (
@@ -142,43 +227,17 @@ class Skeleton(Enemy):
             self.frame_index = 0
             self.attack_cooldown_timer.activate()
 
-        # check if player got hit and apply damage
-        if pygame.sprite.spritecollide(self, self.player_sprites, False,
-                                       pygame.sprite.collide_mask) and self.can_hit and self.state == 'attack' and (
-                self.attack_frames_values[1] > self.frame_index > self.attack_frames_values[0]):
-            self.deal_damage()
-            self.can_hit = False
-            self.damage_cooldown_timer.activate()
-
-    def move(self, dt):
-        player_pos = Vector2(self.player.rect.center)
-        enemy_pos = Vector2(self.rect.center)
-        self.direction = (player_pos - enemy_pos)
-        self.direction = self.direction.normalize() if self.direction else self.direction
-
-        if self.moving:
-            self.hitbox_rect.centerx += self.direction.x * self.speed * dt
-            self.collisions('horizontal', self.hitbox_rect)
-            self.hitbox_rect.centery += self.direction.y * self.speed * dt
-            self.collisions('vertical', self.hitbox_rect)
-            self.rect.center = self.hitbox_rect.center
+    def attack_active(self):
+        return self.chasing and self.can_hit and self.state == 'attack' and (
+                self.attack_frames_values[1] > self.frame_index > self.attack_frames_values[0])
 
-        if self.direction.x < 0:
-            self.flip = True
-        else:
-            self.flip = False
+    def land_hit(self):
+        self.deal_damage()
+        self.can_hit = False
+        self.damage_cooldown_timer.activate()
 
     def animate(self, dt):
-        def animation_speeds():
-            match self.state:
-                case 'attack':
-                    self.animation_speed = 9
-                case 'idle' | 'walk':
-                    self.animation_speed = 10
-                case 'hurt':
-                    self.animation_speed = 5
-
-        animation_speeds()
+        self.update_animation_speed()
         self.frame_index += self.animation_speed * dt
 
         if self.state == 'hurt':
@@ -201,32 +260,26 @@ class Skeleton(Enemy):
             self.animate_state(func=lambda: setattr(self, 'frame_index', 12))
 
     def update(self, dt):
-        if not self.player.is_dead and not self.is_dead:
-            self.attack_cooldown_timer.update()
-            self.damage_cooldown_timer.update()
-            self.check_for_state()
-            self.move(dt)
+        self.chasing = not self.player.is_dead and not self.is_dead
+        if self.chasing:
+            if self.should_think():
+                self.check_for_state()
+            self.flip = self.direction.x < 0
 
         self.state = 'idle' if (self.frame_index > self.animation_length and self.player.is_dead) else self.state
 
-        self.death_timer.update() if self.is_dead else self.death_timer
-
         self.animate(dt)
         self.hitbox_rect = self.rect.inflate(self.hitbox_value)
 
 
 class SmallSkeleton(Skeleton):
-    def __init__(self, pos, frames, player, player_sprites, collision_sprites, groups,
-                 is_spawned_by_necromancer):
-        super().__init__(pos, frames, player, player_sprites, collision_sprites, groups)
-        self.health = 60
-        self.range = 50
-        self.damage = 30
-        self.hitbox_value = (-60, -60)
-        self.attack_frames_values = [6, 7]
+    def __init__(self, pos, frames, player, player_sprites, collision_sprites, groups, archetype,
+                 is_spawned_by_necromancer=False):
+        super().__init__(pos, frames, player, player_sprites, collision_sprites, groups, archetype)
         self.attack_hitbox = self.rect.inflate(50, 70)
         self.sleep = is_spawned_by_necromancer
-        self.sleep_timer = Timer(2000, func=lambda: setattr(self, 'sleep', False), autostart=True)
+        self.sleep_timer = Timer(archetype.cooldowns['sleep'], func=lambda: setattr(self, 'sleep', False),
+                                 autostart=True)
 
     def check_if_in_range(self):
         if self.attack_hitbox.y > self.player.rect.y:
@@ -236,16 +289,7 @@ class SmallSkeleton(Skeleton):
                 return True
 
     def animate(self, dt):
-        def animation_speeds():
-            match self.state:
-                case 'attack':
-                    self.animation_speed = 9
-                case 'idle' | 'walk':
-                    self.animation_speed = 10
-                case 'hurt':
-                    self.animation_speed = 5
-
-        animation_speeds()
+        self.update_animation_speed()
         self.frame_index += self.animation_speed * dt
 
         if self.state == 'hurt':
@@ -268,44 +312,34 @@ class SmallSkeleton(Skeleton):
             self.animate_state(func=lambda: setattr(self, 'frame_index', 3))
 
     def update(self, dt):
+        self.chasing = not self.sleep and not self.player.is_dead and not self.is_dead
         if not self.sleep:
-            if not self.player.is_dead and not self.is_dead:
-                self.attack_cooldown_timer.update()
-                self.damage_cooldown_timer.update()
-                self.check_for_state()
-                self.move(dt)
+            if self.chasing:
+                if self.should_think():
+                    self.check_for_state()
+                self.flip = self.direction.x < 0
 
             self.state = 'idle' if (self.frame_index > self.animation_length and self.player.is_dead) else self.state
 
-            self.death_timer.update() if self.is_dead else self.death_timer
-
             self.animate(dt)
             self.hitbox_rect = self.rect.inflate(self.hitbox_value)
             self.attack_hitbox = self.rect.inflate(50, 70)
         else:
-            self.sleep_timer.update()
-            mask = pygame.mask.from_surface(self.frames['idle'][0][0]).to_surface()
-            mask.set_colorkey('black')
-            self.image = mask
+            self.image = silhouette(self.frames['idle'][0][0])
 
 
 class NightBorne(Enemy):
-    def __init__(self, pos, frames, player, player_sprites, starting_pos, collision_sprites, groups):
-        super().__init__(pos, frames, player, player_sprites, collision_sprites, groups)
-        self.max_health = 100
-        self.health = self.max_health
+    def __init__(self, pos, frames, player, player_sprites, collision_sprites, groups, archetype):
+        super().__init__(pos, frames, player, player_sprites, collision_sprites, groups, archetype)
         self.camera_x = 1
         self.camera_y = 1
 
-        # movement
-        self.speed = 250
-        self.direction = Vector2(choice([-1, 1]), 0)
-        self.starting_pos = starting_pos
-        self.hitbox_rect = self.rect.inflate(-100, -100)
+        # movement, patrols around where it spawned
+        self.direction = Vector2(rng.ai.choice([-1, 1]), 0)
+        self.starting_pos = pos
         self.moving = True
 
         # combat
-        self.damage = 50
         self.is_in_movement_area = True
         self.can_teleport = True
         self.can_attack = True
@@ -318,12 +352,14 @@ class NightBorne(Enemy):
         self.teleport_cooldown = False
 
         self.can_turn_in_area = True
-        self.can_turn_in_area_timer = Timer(100, func=lambda: setattr(self, 'can_turn_in_area', True))
-        self.attack_cooldown_timer = Timer(1, func=lambda: setattr(self, 'can_attack', True))
-        self.damage_cooldown_timer = Timer(700, func=lambda: setattr(self, 'can_damage', True))
-        self.teleportation_damage_timer = Timer(100, func=lambda: setattr(self, 'can_damage', True))
-        self.line_draw_timer = Timer(100, func=lambda: setattr(self, 'can_draw_line', False))
-        self.teleport_cooldown_timer = Timer(200,
+        cooldowns = archetype.cooldowns
+        self.can_turn_in_area_timer = Timer(cooldowns['turn'], func=lambda: setattr(self, 'can_turn_in_area', True))
+        self.attack_cooldown_timer = Timer(cooldowns['attack'], func=lambda: setattr(self, 'can_attack', True))
+        self.damage_cooldown_timer = Timer(cooldowns['damage'], func=lambda: setattr(self, 'can_damage', True))
+        self.teleportation_damage_timer = Timer(cooldowns['teleport-damage'],
+                                                func=lambda: setattr(self, 'can_damage', True))
+        self.line_draw_timer = Timer(cooldowns['line'], func=lambda: setattr(self, 'can_draw_line', False))
+        self.teleport_cooldown_timer = Timer(cooldowns['teleport'],
                                              func=lambda: (self.teleport(), setattr(self, 'teleport_cooldown', False)))
 
     def teleport(self):
@@ -372,17 +408,17 @@ class NightBorne(Enemy):
             self.can_attack = False
             self.moving = False
 
-        if pygame.sprite.spritecollide(self, self.player_sprites, False,
-                                       pygame.sprite.collide_mask) and self.can_damage and self.state == 'attack' and (
-                11 > self.frame_index > 9):
-            # 9 and 10
-            self.deal_damage()
-            self.can_damage = False
-            self.damage_cooldown_timer.activate()
+    def attack_active(self):
+        # 9 and 10
+        return not self.teleport_cooldown and self.can_damage and self.state == 'attack' and (
+                11 > self.frame_index > 9)
 
-    def movement(self, dt):
-        self.camera_x = self.player.rect.centerx - WINDOW_WIDTH // 2
-        self.camera_y = self.player.rect.centery - WINDOW_HEIGHT // 2
+    def land_hit(self):
+        self.deal_damage()
+        self.can_damage = False
+        self.damage_cooldown_timer.activate()
+
+    def turn_in_area(self):
         area_pos = (self.starting_pos[0] - 200, self.starting_pos[1] - 80)
         area_rect = pygame.Rect(area_pos, (400, 200))
 
@@ -392,6 +428,10 @@ class NightBorne(Enemy):
                 self.can_turn_in_area = False
                 self.can_turn_in_area_timer.activate()
 
+    def movement(self, dt):
+        self.camera_x = self.player.rect.centerx - WINDOW_WIDTH // 2
+        self.camera_y = self.player.rect.centery - WINDOW_HEIGHT // 2
+
         if self.moving:
             self.hitbox_rect.x += self.direction.x * self.speed * dt
             self.collisions('horizontal', self.hitbox_rect)
@@ -411,20 +451,7 @@ class NightBorne(Enemy):
         if self.direction and self.moving and not self.teleporting and not self.teleport_cooldown:
             self.state = 'walk'
 
-        def animation_speeds():
-            match self.state:
-                case 'idle' | 'walk':
-                    self.animation_speed = 10
-                case 'attack':
-                    self.animation_speed = 15
-                case 'hurt':
-                    self.animation_speed = 15
-                case 'teleport':
-                    self.animation_speed = 8
-                case 'death':
-                    self.animation_speed = 12
-
-        animation_speeds()
+        self.update_animation_speed()
         self.frame_index += self.animation_speed * dt
 
         match self.state:
@@ -461,55 +488,55 @@ class NightBorne(Enemy):
                 self.activate_line_timer = False
 
     def update(self, dt):
-        self.teleport_cooldown_timer.update()
-
         if not self.player.is_dead and not self.teleport_cooldown:
-            self.teleportation_damage_timer.update()
-            if self.can_draw_line:
-                self.line_draw_timer.update()
-            if not self.can_damage:
-                self.damage_cooldown_timer.update()
-            if not self.can_turn_in_area:
-                self.can_turn_in_area_timer.update()
-            if not self.can_attack:
-                self.attack_cooldown_timer.update()
             if not self.is_dead:
+                think = self.should_think()
+                if think:
+                    self.turn_in_area()
                 self.movement(dt)
-                self.initiate_attack()
+                if think:
+                    self.initiate_attack()
         else:
             self.state = 'idle' if self.frame_index > self.animation_length else 1
 
-        self.hitbox_rect = self.rect.inflate(-100, -100)
+        self.hitbox_rect = self.rect.inflate(self.hitbox_value)
         self.animate(dt)
 
 
 class Necromancer(Enemy):
-    def __init__(self, pos, frames, player, player_sprites, starting_pos, collision_sprites, groups,
-                 lasers, skeleton_frames):
-        super().__init__(pos, frames, player, player_sprites, collision_sprites, groups)
+    def __init__(self, pos, frames, player, player_sprites, collision_sprites, groups, archetype,
+                 laser_pool, skeleton_frames, skeleton_archetype):
+        super().__init__(pos, frames, player, player_sprites, collision_sprites, groups, archetype)
         self.groups = groups
         self.all_sprites = groups[0]
-        self.health = 80
-        self.direction = Vector2(uniform(0, 1), uniform(0, 1))
-        self.speed = 100
-        self.hitbox_rect = self.rect.inflate(-110, -50)
-        self.starting_pos = starting_pos
+        self.direction = Vector2(rng.ai.uniform(0, 1), rng.ai.uniform(0, 1))
+        self.starting_pos = pos
         self.collision_sprites = collision_sprites
 
+        cooldowns = archetype.cooldowns
         self.can_change_direction = True
         self.can_attack = True
-        self.change_direction_timer = Timer(2100, func=lambda: setattr(self, 'can_change_direction', True))
-        self.attack_cooldown_timer = Timer(2000, func=lambda: setattr(self, 'can_attack', True))
+        self.change_direction_timer = Timer(cooldowns['change-direction'],
+                                            func=lambda: setattr(self, 'can_change_direction', True))
+        self.attack_cooldown_timer = Timer(cooldowns['attack'], func=lambda: setattr(self, 'can_attack', True))
         self.moving = True
-        self.laser_damage = 40
         self.can_create_laser = True
-        self.laser_creation_timer = Timer(200, func=lambda: setattr(self, 'can_create_laser', True))
-        self.lasers = lasers
+        self.laser_creation_timer = Timer(cooldowns['laser'], func=lambda: setattr(self, 'can_create_laser', True))
+        self.laser_pool = laser_pool
 
         self.can_spawn_skeletons = True
-        self.skeleton_summoning_timer = Timer(200, func=lambda: setattr(self, 'can_spawn_skeletons', True))
+        self.skeleton_summoning_timer = Timer(cooldowns['summon'],
+                                              func=lambda: setattr(self, 'can_spawn_skeletons', True))
 
         self.skeleton_frames = skeleton_frames
+        self.skeleton_archetype = skeleton_archetype
+
+    @classmethod
+    def spawn(cls, pos, frames, archetype, game):
+        skeleton_archetype = game.archetypes[archetype.summons]
+        return cls(pos, frames, game.player, game.player_sprites, game.collision_sprites,
+                   (game.all_sprites, game.enemy_sprites), archetype, game.laser_pool,
+                   game.enemy_assets.get(skeleton_archetype.frames), skeleton_archetype)
 
     def skeleton_spell(self):
         self.frame_index = 0
@@ -520,9 +547,9 @@ class Necromancer(Enemy):
     def summon_skeletons(self):
         offset = 50
         for i in range(1):
-            pos = self.rect.center + Vector2(random.randint(-offset - 20, offset), random.randint(-offset - 20, offset))
+            pos = self.rect.center + Vector2(rng.ai.randint(-offset - 20, offset), rng.ai.randint(-offset - 20, offset))
             SmallSkeleton(pos, self.skeleton_frames, self.player,
-                          self.player_sprites, self.collision_sprites, self.groups, True)
+                          self.player_sprites, self.collision_sprites, self.groups, self.skeleton_archetype, True)
 
     def attack(self):
         self.frame_index = 0
@@ -537,6 +564,16 @@ class Necromancer(Enemy):
         elif self.direction.x < 0:
             self.flip = True
 
+        # movement
+        self.direction = self.direction.normalize() if self.direction else self.direction
+        if self.moving:
+            self.hitbox_rect.centerx += self.direction.x * self.speed * dt
+            self.collisions('horizontal', self.hitbox_rect)
+            self.hitbox_rect.centery += self.direction.y * self.speed * dt
+            self.collisions('vertical', self.hitbox_rect)
+            self.rect.center = self.hitbox_rect.center
+
+    def decide(self):
         # range rect
         range_rect_size = (900, 700)
         range_rect_offset = Vector2(-380, -230)
@@ -549,19 +586,10 @@ class Necromancer(Enemy):
         self.area_rect = FRect((self.starting_pos[0], self.starting_pos[1]) + area_rect_offset,
                                area_rect_size)
 
-        # movement
-        self.direction = self.direction.normalize() if self.direction else self.direction
-        if self.moving:
-            self.hitbox_rect.centerx += self.direction.x * self.speed * dt
-            self.collisions('horizontal', self.hitbox_rect)
-            self.hitbox_rect.centery += self.direction.y * self.speed * dt
-            self.collisions('vertical', self.hitbox_rect)
-            self.rect.center = self.hitbox_rect.center
-
         # change the direction ever few second
         if self.can_change_direction:
             if self.area_rect.contains(self.hitbox_rect):
-                self.direction = Vector2(uniform(-1, 1), uniform(-1, 1))
+                self.direction = Vector2(rng.ai.uniform(-1, 1), rng.ai.uniform(-1, 1))
             else:
                 self.direction.y *= -1
                 self.direction.x *= -1
@@ -571,29 +599,14 @@ class Necromancer(Enemy):
         # attack if player is in range
         skeleton_spell_chance = 10  # chance is in percentages
         if self.range_rect.contains(self.player.hitbox_rect) and self.can_attack:
-            if random.randint(0, 100) <= skeleton_spell_chance:
+            if rng.ai.randint(0, 100) <= skeleton_spell_chance:
                 self.skeleton_spell()
             else:
                 self.attack()
             self.can_attack = False
 
     def animate(self, dt):
-        def animation_speeds():
-            match self.state:
-                case 'idle':
-                    self.animation_speed = 8
-                case 'walk':
-                    self.animation_speed = 8
-                case 'attack-3':
-                    self.animation_speed = 12
-                case 'attack-1':
-                    self.animation_speed = 6
-                case 'hurt':
-                    self.animation_speed = 12
-                case 'death':
-                    self.animation_speed = 8
-
-        animation_speeds()
+        self.update_animation_speed()
         self.frame_index += self.animation_speed * dt
 
         if self.direction and self.moving:
@@ -610,9 +623,9 @@ class Necromancer(Enemy):
                                    func=lambda: (setattr(self, 'frame_index', 0), setattr(self, 'moving', True)))
 
                 if (14 > self.frame_index > 11) and self.can_create_laser:
-                    NecromancerLaser(self.rect.topright + Vector2(-120, 75), self.player, self.player_sprites,
-                                     self.laser_damage, self.collision_sprites,
-                                     (self.all_sprites, self.lasers))
+                    self.laser_pool.spawn(self.rect.topright + Vector2(-120, 75), self.player, self.player_sprites,
+                                          self.damage, self.collision_sprites,
+                                          (self.all_sprites, self.laser_pool.lasers))
                     self.can_create_laser = False
                     self.laser_creation_timer.activate()
             case 'attack-1':
@@ -628,27 +641,54 @@ class Necromancer(Enemy):
 
     def update(self, dt):
         if not self.is_dead:
-            if not self.can_create_laser:
-                self.laser_creation_timer.update()
-            if not self.can_spawn_skeletons:
-                self.skeleton_summoning_timer.update()
-
-            if self.moving:
-                self.change_direction_timer.update()
-            if not self.can_attack:
-                self.attack_cooldown_timer.update()
             self.movement(dt)
+            if self.should_think():
+                self.decide()
             self.hitbox_rect = self.rect.inflate(-110, -35) if self.direction.y > 0 else self.hitbox_rect
             self.hitbox_rect = self.rect.inflate(-110, -150) if self.direction.y < 0 else self.hitbox_rect
 
         self.animate(dt)
 
 
+class LaserPool:
+    # the laser image, its flipped twin and their masks are prepared once, dead lasers wait in a free list
+    def __init__(self, lasers):
+        self.lasers = lasers
+        self.images = None
+        self.free = []
+
+    def load(self):
+        image = pygame.transform.scale(
+            load_image('images/Necromancer/laser.png').convert_alpha(), (100, 100))
+        self.images = {False: image, True: flip_frame(image, True)}
+        for image in self.images.values():
+            frame_mask(image)
+
+    def spawn(self, pos, player, player_sprites, damage, collision_sprites, groups):
+        if self.images is None:
+            self.load()
+        laser = self.free.pop() if self.free else NecromancerLaser(self)
+        laser.reset(pos, player, player_sprites, damage, collision_sprites, groups)
+        return laser
+
+    def release(self, laser):
+        self.free.append(laser)
+
+
 class NecromancerLaser(pygame.sprite.Sprite):
-    def __init__(self, pos, player, player_sprites, damage, collision_sprites, groups):
-        super().__init__(groups)
-        self.image = pygame.transform.scale(
-            pygame.image.load(join('..\\', 'static', 'images', 'Necromancer', 'laser.png')).convert_alpha(), (100, 100))
+    def __init__(self, pool):
+        super().__init__()
+        self.pool = pool
+
+        # others
+        self.speed = 500
+
+        # lifetime
+        self.lifetime = 2000  # 2s
+        self.death_timer = Timer(self.lifetime, func=lambda: self.kill())
+
+    def reset(self, pos, player, player_sprites, damage, collision_sprites, groups):
+        self.image = self.pool.images[False]
         self.rect = self.image.get_frect(topleft=pos)
 
         # movement
@@ -665,72 +705,55 @@ class NecromancerLaser(pygame.sprite.Sprite):
         elif self.direction.x < 0:
             self.flip = True
 
-        self.image = pygame.transform.flip(pygame.transform.scale(
-            pygame.image.load(join('..\\', 'static', 'images', 'Necromancer', 'laser.png')), (100, 100)), self.flip,
-            False)
+        self.image = self.pool.images[self.flip]
+        self.mask = frame_mask(self.image)
 
         # others
         self.player_sprites = player_sprites
-        self.speed = 500
         self.damage = damage
         self.can_damage_the_player = True
         self.collision_sprites = collision_sprites
 
-        # lifetime
-        self.lifetime = 2000  # 2s
-        self.death_timer = Timer(self.lifetime, func=lambda: self.kill(), autostart=True)
+        self.death_timer.activate()
+        self.add(groups)
+
+    def kill(self):
+        # back to the pool instead of the garbage collector
+        if self.alive():
+            super().kill()
+            self.death_timer.cancel()
+            self.pool.release(self)
 
     def move(self, dt):
         self.rect.center += self.direction * self.speed * dt
 
-    def check_for_player_collision(self):
-        if pygame.sprite.spritecollide(self, self.player_sprites, False,
-                                       pygame.sprite.collide_mask) and self.can_damage_the_player:
-            self.player.health -= self.damage
-            self.player.state = 'hurt'
-            self.player.onetap_animation_running = True
-            self.player.frame_index = 0
-            self.can_damage_the_player = False
-            self.kill()
+    def attack_active(self):
+        return self.can_damage_the_player
+
+    def land_hit(self):
+        self.player.health -= self.damage
+        self.player.state = 'hurt'
+        self.player.onetap_animation_running = True
+        self.player.frame_index = 0
+        self.can_damage_the_player = False
+        self.kill()
 
     def update(self, dt):
-        self.death_timer.update()
         self.move(dt)
-        self.check_for_player_collision()
 
 
 class Goblin(Enemy):
-    def __init__(self, pos, frames, player, player_sprites, collision_sprites, groups):
-        super().__init__(pos, frames, player, player_sprites, collision_sprites, groups)
-        self.hitbox_rect = self.rect.inflate(-102, -102)
+    chase_offset = (0, 0)
 
+    def __init__(self, pos, frames, player, player_sprites, collision_sprites, groups, archetype):
+        super().__init__(pos, frames, player, player_sprites, collision_sprites, groups, archetype)
         # movement
         self.direction = Vector2()
-        self.speed = 160
         self.moving = True
 
-        # animations
-        self.animation_speed = 8
-
         # combat
-        self.health = 60
-        self.damage = 3
         self.can_attack = True
 
-        self.death_timer = Timer(2000, func=lambda: self.kill())
-
-    def move(self, dt):
-        self.direction.x = self.player.rect.centerx - self.rect.centerx
-        self.direction.y = self.player.rect.centery - self.rect.centery
-        self.direction = self.direction.normalize() if self.direction else self.direction
-
-        if self.moving:
-            self.hitbox_rect.centerx += self.direction.x * self.speed * dt
-            self.collisions('horizontal', self.hitbox_rect)
-            self.hitbox_rect.centery += self.direction.y * self.speed * dt
-            self.collisions('vertical', self.hitbox_rect)
-            self.rect.center = self.hitbox_rect.center
-
     def attack(self):
         range_rect_pos = (self.rect.centerx, self.rect.centery) + Vector2(-20, 5)
         range_rect_size = (40, 10)
@@ -743,14 +766,15 @@ class Goblin(Enemy):
             self.moving = False
             self.can_attack = False
 
-    def animate(self, dt):
-        def animation_speeds():
-            match self.state:
-                case 'idle' | 'walk':
-                    self.animation_speed = 10
+    def attack_active(self):
+        return self.state == 'attack' and 6 < self.frame_index < 7
+
+    def land_hit(self):
+        self.deal_damage()
 
+    def animate(self, dt):
         self.check_for_flip()
-        animation_speeds()
+        self.update_animation_speed()
         self.frame_index += self.animation_speed * dt
 
         match self.state:
@@ -767,21 +791,16 @@ class Goblin(Enemy):
                 if not self.is_dead:
                     self.animate_state(looped=False,
                                        func=lambda: (setattr(self, 'moving', True), setattr(self, 'can_attack', True)))
-                    if pygame.sprite.spritecollide(self, self.player_sprites, False, pygame.sprite.collide_mask):
-                        if 6 < self.frame_index < 7:
-                            self.deal_damage()
 
         if self.direction and self.moving:
             self.state = 'walk'
 
     def update(self, dt):
-        if not self.is_dead and not self.player.is_dead:
-            self.move(dt)
+        self.chasing = not self.is_dead and not self.player.is_dead
+        if self.chasing and self.should_think():
             self.attack()
-        else:
-            self.death_timer.update()
         self.animate(dt)
-        self.hitbox_rect = self.rect.inflate(-100, -100)
+        self.hitbox_rect = self.rect.inflate(self.hitbox_value)
 
         if self.player.is_dead:
             self.state = 'idle'
@@ -789,38 +808,19 @@ class Goblin(Enemy):
 
 
 class EvilEye(Enemy):
-    def __init__(self, pos, frames, player, player_sprites, collision_sprites, groups):
-        super().__init__(pos, frames, player, player_sprites, collision_sprites, groups)
-        self.hitbox_rect = self.rect.inflate(-100, -100)
+    chase_offset = (0, 0)
 
+    def __init__(self, pos, frames, player, player_sprites, collision_sprites, groups, archetype):
+        super().__init__(pos, frames, player, player_sprites, collision_sprites, groups, archetype)
         # movement
         self.direction = Vector2()
-        self.speed = 160
         self.moving = True
 
-        # animations
-        self.animation_speed = 8
-
         # combat
-        self.health = 60
-        self.damage = 40
         self.can_attack = True
         self.can_damage = True
 
-        self.death_timer = Timer(10000, func=lambda: self.kill())
-        self.can_damage_timer = Timer(100, func=lambda: setattr(self, 'can_damage', True))
-
-    def move(self, dt):
-        self.direction.x = self.player.rect.centerx - self.rect.centerx
-        self.direction.y = self.player.rect.centery - self.rect.centery
-        self.direction = self.direction.normalize() if self.direction else self.direction
-
-        if self.moving:
-            self.hitbox_rect.centerx += self.direction.x * self.speed * dt
-            self.collisions('horizontal', self.hitbox_rect)
-            self.hitbox_rect.centery += self.direction.y * self.speed * dt
-            self.collisions('vertical', self.hitbox_rect)
-            self.rect.center = self.hitbox_rect.center
+        self.can_damage_timer = Timer(archetype.cooldowns['damage'], func=lambda: setattr(self, 'can_damage', True))
 
     def attack(self):
         range_rect_pos = (self.rect.centerx, self.rect.centery) + Vector2(-20, 5)
@@ -834,14 +834,17 @@ class EvilEye(Enemy):
             self.moving = False
             self.can_attack = False
 
-    def animate(self, dt):
-        def animation_speeds():
-            match self.state:
-                case 'walk':
-                    self.animation_speed = 10
+    def attack_active(self):
+        return self.state == 'attack' and (6 < self.frame_index < 7) and self.can_damage
 
+    def land_hit(self):
+        self.deal_damage()
+        self.can_damage = False
+        self.can_damage_timer.activate()
+
+    def animate(self, dt):
         self.check_for_flip()
-        animation_speeds()
+        self.update_animation_speed()
         self.frame_index += self.animation_speed * dt
 
         match self.state:
@@ -858,71 +861,38 @@ class EvilEye(Enemy):
                 if not self.is_dead:
                     self.animate_state(looped=False,
                                        func=lambda: (setattr(self, 'moving', True), setattr(self, 'can_attack', True)))
-                    if pygame.sprite.spritecollide(self, self.player_sprites, False, pygame.sprite.collide_mask):
-                        if (6 < self.frame_index < 7) and self.can_damage:
-                            self.deal_damage()
-                            self.can_damage = False
-                            self.can_damage_timer.activate()
 
         if self.direction and self.moving:
             self.state = 'walk'
 
     def update(self, dt):
-        if not self.is_dead and not self.player.is_dead:
-            if not self.can_damage:
-                self.can_damage_timer.update()
-            self.move(dt)
+        self.chasing = not self.is_dead and not self.player.is_dead
+        if self.chasing and self.should_think():
             self.attack()
-        else:
-            self.death_timer.update()
         self.animate(dt)
-        self.hitbox_rect = self.rect.inflate(-100, -100)
+        self.hitbox_rect = self.rect.inflate(self.hitbox_value)
 
 
 class DemonSlime(Enemy):
-    def __init__(self, pos, frames, player, player_sprites, collision_sprites, groups):
-        super().__init__(pos, frames, player, player_sprites, collision_sprites, groups)
-        self.hitbox_rect = self.rect.inflate(-140, -130)
+    # aims above the player so the slam lands on them
+    chase_offset = (0, -70)
 
+    def __init__(self, pos, frames, player, player_sprites, collision_sprites, groups, archetype):
+        super().__init__(pos, frames, player, player_sprites, collision_sprites, groups, archetype)
         # movement
         self.direction = Vector2()
-        self.speed = 160
         self.moving = True
 
-        # animations
-        self.animation_speed = 8
-
         # combat
-        self.health = 1000
-        self.damage = 35
         self.can_attack = True
         self.can_damage = True
 
-        self.death_timer = Timer(10000, func=lambda: self.kill())
-        self.can_damage_timer = Timer(100, func=lambda: setattr(self, 'can_damage', True))
-
-    def move(self, dt):
-        player_pos = Vector2(self.player.rect.center) + Vector2(0, -70)
-        enemy_pos = Vector2(self.rect.center)
-
-        self.direction = (player_pos - enemy_pos)
-        self.direction = self.direction.normalize() if self.direction else self.direction
-
-        if self.moving:
-            self.hitbox_rect.centerx += self.direction.x * self.speed * dt
-            self.collisions('horizontal', self.hitbox_rect)
-            self.hitbox_rect.centery += self.direction.y * self.speed * dt
-            self.collisions('vertical', self.hitbox_rect)
-            self.rect.center = self.hitbox_rect.center
+        self.can_damage_timer = Timer(archetype.cooldowns['damage'], func=lambda: setattr(self, 'can_damage', True))
 
     def attack(self):
-        camera_x = self.player.rect.centerx - WINDOW_WIDTH // 2
-        camera_y = self.player.rect.centery - WINDOW_HEIGHT // 2
-
         range_rect_pos = (self.rect.centerx, self.rect.centery) + Vector2(-15, 60)
         range_rect_size = (40, 10)
         range_rect = FRect(range_rect_pos, range_rect_size)
-        pygame.draw.rect(self.screen, 'black', range_rect, 10)
 
         # check if player is in range
         if range_rect.colliderect(self.player.hitbox_rect) and self.can_attack:
@@ -931,18 +901,20 @@ class DemonSlime(Enemy):
             self.moving = False
             self.can_attack = False
 
-    def animate(self, dt):
-        def animation_speeds():
-            match self.state:
-                case 'walk':
-                    self.animation_speed = 10
+    def attack_active(self):
+        return self.state == 'attack' and (9 < self.frame_index < 12) and self.can_damage
+
+    def land_hit(self):
+        self.can_damage = False
+        self.can_damage_timer.activate()
 
+    def animate(self, dt):
         if self.direction.x > 0:
             self.flip = True
         elif self.direction.x < 0:
             self.flip = False
 
-        animation_speeds()
+        self.update_animation_speed()
         self.frame_index += self.animation_speed * dt
 
         match self.state:
@@ -954,24 +926,29 @@ class DemonSlime(Enemy):
                 if not self.is_dead:
                     self.animate_state(looped=False,
                                        func=lambda: (setattr(self, 'moving', True), setattr(self, 'can_attack', True)))
-                    if pygame.sprite.spritecollide(self, self.player_sprites, False, pygame.sprite.collide_mask):
-                        if (9 < self.frame_index < 12) and self.can_damage:
-                            self.can_damage = False
-                            self.can_damage_timer.activate()
 
         if self.direction and self.moving:
             self.state = 'walk'
 
     def update(self, dt):
-        if self.check_for_death():
+        if self.check_for_death() and not self.death_timer:
             self.death_timer.activate()
-        if not self.is_dead and not self.player.is_dead:
-            if not self.can_damage:
-                self.can_damage_timer.update()
-            self.move(dt)
+            # hits never reset its frames, a walk can have looped far past the last death frame
+            self.frame_index = 0
+        self.chasing = not self.is_dead and not self.player.is_dead
+        if self.chasing and self.should_think():
             self.attack()
-        else:
-            self.death_timer.update()
         self.animate(dt)
-        self.hitbox_rect = self.rect.inflate(-140, -150)
-        print(self.health)
+        self.hitbox_rect = self.rect.inflate(self.hitbox_value)
+
+
+# enemies_info.json names its classes with these
+ENEMY_CLASSES = {
+    'Skeleton': Skeleton,
+    'SmallSkeleton': SmallSkeleton,
+    'NightBorne': NightBorne,
+    'Necromancer': Necromancer,
+    'Goblin': Goblin,
+    'EvilEye': EvilEye,
+    'DemonSlime': DemonSlime
+}
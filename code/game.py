@@ -1,50 +1,112 @@
 from settings import *
-from groups import AllSprites
-from support import tile_importer
+from groups import AllSprites, CollisionSprites, EnemySprites
+from layers import StaticLayer
+from support import tile_importer, cache_frames
+from assets import AssetRegistry
 from ui import Ui
-from pytmx import load_pygame
-from sprites import Sprite, CollisionSprite
-from player import Player
+from maps import load_map
+from resources import open_asset
+from sprites import CollisionSprite
+from player import Player, ScriptedKeys
+from timers import SimulatedClock, TimerScheduler, use_clock, use_scheduler
+from profiler import FrameProfiler
+from navigation import Navigation
+from combat import Combat
+from waves import WaveDirector
+from replay import InputRecorder, load_recording
 from enemies import *
+import rng
 import json
+import os
+import random
 
 
 class Game:
-    def __init__(self):
+    def __init__(self, headless=False, stat_overrides=None, dirty_rects=False, seed=None, record=None, replay=None,
+                 fps_cap=FPS_CAP, vsync=False):
+        # headless runs have no window, no music and no drawing
+        self.headless = headless
+        # record: file the input of every simulation step is written to, replay: a recording to play back
+        self.replay_steps = None
+        self.step_dt = SIMULATION_DT
+        if replay:
+            seed, self.step_dt, self.replay_steps = load_recording(replay)
+        self.seed = seed if seed is not None else random.randrange(2 ** 32)
+        rng.seed_streams(self.seed)
+        self.recorder = InputRecorder(record, self.seed, self.step_dt) if record else None
+        # frames drawn per second at most, 0 leaves pacing to vsync or runs uncapped
+        self.fps_cap = fps_cap
+        # redraw only what changed while the camera stands still, for fill rate bound machines
+        self.dirty_rects = dirty_rects
+        self.hud_rects = []
+        # enemy name -> {stat: value} applied to every enemy of that name, used by balance sweeps
+        self.stat_overrides = stat_overrides or {}
+        if self.headless:
+            os.environ['SDL_VIDEODRIVER'] = 'dummy'
+            os.environ['SDL_AUDIODRIVER'] = 'dummy'
+        # timers run on simulation time, advanced by every step, so they agree with movement and replays
+        self.simulated_clock = SimulatedClock()
+        use_clock(self.simulated_clock)
+        # seeded runs must spawn on the same frames every time, windowed play may spend a time budget
+        self.reproducible = self.headless or record is not None or replay is not None
+        # every entity timer is fired from here
+        self.timers = TimerScheduler()
+        use_scheduler(self.timers)
+
         pygame.init()
-        self.screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+        # vsync needs a renderer behind the window, SCALED provides one
+        self.screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT), pygame.SCALED if vsync else 0,
+                                              vsync=int(vsync))
         self.clock = pygame.time.Clock()
         self.running = True
 
         # groups
-        self.all_sprites = AllSprites()
-        self.collision_sprites = pygame.sprite.Group()
-        self.enemy_sprites = pygame.sprite.Group()
+        self.collision_sprites = CollisionSprites()
+        self.all_sprites = AllSprites(self.collision_sprites)
+        self.enemy_sprites = EnemySprites()
         self.player_sprites = pygame.sprite.Group()
         self.player_attack_sprites = pygame.sprite.Group()
         self.necromancer_lasers = pygame.sprite.Group()
+        self.laser_pool = LaserPool(self.necromancer_lasers)
         self.wave_enemies = pygame.sprite.Group()
 
         self.ground_locations = []
         self.load_assets()
         self.setup()
-        self.game_music = pygame.mixer.Sound(join('..\\', 'static', 'audio', 'game-music.wav'))
-        self.game_music.set_volume(0.1)
-        self.game_music.play(-1)
+        if not self.headless:
+            self.game_music = pygame.mixer.Sound(open_asset('audio/game-music.wav'))
+            self.game_music.set_volume(0.1)
+            self.game_music.play(-1)
+
+        # every hit of a frame is resolved in one place
+        self.combat = Combat(self.player, self.enemy_sprites, self.player_attack_sprites, self.necromancer_lasers)
 
         # ui
         self.ui = Ui(self.player)
+        self.profiler = FrameProfiler({
+            'all_sprites': self.all_sprites,
+            'enemy_sprites': self.enemy_sprites,
+            'player_attack_sprites': self.player_attack_sprites,
+            'necromancer_lasers': self.necromancer_lasers,
+            'collision_sprites': self.collision_sprites
+        })
 
         # gameplay
         self.current_wave = 1
         self.game_started = False
-        with open(join('..\\', 'static', 'data', 'waves_info.json')) as json_file:
+        with open_asset('data/waves_info.json') as json_file:
             self.json_data = json.load(json_file)
+        # enemy name in waves_info.json -> its stats, class and frames from enemies_info.json, overrides applied
+        self.archetypes = load_archetypes('data/enemies_info.json', self.stat_overrides)
+        self.wave_limit = len(self.json_data['waves-data'])
+        self.wave_director = WaveDirector(self.json_data['waves-data'], self.archetypes, self.spawn, self.wave_enemies,
+                                          None if self.reproducible else SPAWN_BUDGET)
+        self.enemy_assets.prefetch(self.wave_frames(1))
 
     def load_assets(self):
         # 2nd argument is animation length
         # player
-        player_frames = tile_importer(9, 7, (260, 260), join('..\\', 'static', 'images', 'Soldier', 'Soldier.png'))
+        player_frames = tile_importer(9, 7, (260, 260), 'images/Soldier/Soldier.png')
         self.player_frames = {
             'idle': [player_frames[0], 6],
             'walk': [player_frames[1], 8],
@@ -57,41 +119,53 @@ class Game:
         # player attacks
         player_attack_frames = tile_importer(6, 1, (400, 400),
                                              (
-                                                 (join('..\\', 'static', 'images', 'Soldier', 'basic_effect.png'), 6),
-                                                 (join('..\\', 'static', 'images', 'Soldier', 'heavy_effect.png'), 6),
-                                                 (join('..\\', 'static', 'images', 'Soldier', 'ranged_effect.png'), 6)
+                                                 ('images/Soldier/basic_effect.png', 6),
+                                                 ('images/Soldier/heavy_effect.png', 6),
+                                                 ('images/Soldier/ranged_effect.png', 6)
                                              ), multiple_files=True)
         self.player_attack_frames = {
             'basic-effect': [player_attack_frames[0][3], player_attack_frames[0][4]],
             'heavy-effect': [player_attack_frames[1][3], player_attack_frames[1][4]],
             'ranged-effect': [player_frames[2][4], player_attack_frames[2][5]]
         }
-        # skeleton frames
-        skeleton_frames = tile_importer(13, 5, (170, 170), join('..\\', 'static', 'images', 'Skeleton', 'skeleton.png'))
-        self.skeleton_frames = {
+        # enemies are loaded lazily, the first time a wave needs them
+        self.enemy_assets = AssetRegistry({
+            'Skeleton': self.load_skeleton_frames,
+            'SmallSkeleton': self.load_small_skeleton_frames,
+            'NightBorne': self.load_night_borne_frames,
+            'Necromancer': self.load_necromancer_frames,
+            'Goblin': self.load_goblin_frames,
+            'EvilEye': self.load_evil_eye_frames,
+            'DemonSlime': self.load_demon_slime_frames
+        }, dependencies={'Necromancer': ('SmallSkeleton',)})
+
+        # flipped twins and collision masks
+        for animation, _ in self.player_frames.values():
+            cache_frames(animation)
+        for effect in self.player_attack_frames.values():
+            cache_frames(effect)
+
+    def load_skeleton_frames(self):
+        skeleton_frames = tile_importer(13, 5, (170, 170), 'images/Skeleton/skeleton.png')
+        return {
             'attack': [skeleton_frames[0], 13],
             'death': [skeleton_frames[1], 13],
             'walk': [skeleton_frames[2], 12],
             'idle': [skeleton_frames[3], 4],
             'hurt': [skeleton_frames[4], 3]
         }
-        # small skeleton
+
+    def load_small_skeleton_frames(self):
         small_skeleton_frames = tile_importer(8, 1, (125, 125), (
-            (join('..\\', 'static', 'images', 'Small_Skeleton',
-                  'Attack.png'), 8),
-            (join('..\\', 'static', 'images', 'Small_Skeleton',
-                  'Death.png'), 4),
-            (join('..\\', 'static', 'images', 'Small_Skeleton',
-                  'Idle.png'), 4),
-            (join('..\\', 'static', 'images', 'Small_Skeleton',
-                  'Shield.png'), 4),
-            (join('..\\', 'static', 'images', 'Small_Skeleton',
-                  'Hurt.png'), 4),
-            (join('..\\', 'static', 'images', 'Small_Skeleton',
-                  'Walk.png'), 4)
+            ('images/Small_Skeleton/Attack.png', 8),
+            ('images/Small_Skeleton/Death.png', 4),
+            ('images/Small_Skeleton/Idle.png', 4),
+            ('images/Small_Skeleton/Shield.png', 4),
+            ('images/Small_Skeleton/Hurt.png', 4),
+            ('images/Small_Skeleton/Walk.png', 4)
         ),
                                               multiple_files=True)
-        self.small_skeleton_frames = {
+        return {
             'attack': [small_skeleton_frames[0], 8],
             'death': [small_skeleton_frames[1], 4],
             'idle': [small_skeleton_frames[2], 4],
@@ -99,10 +173,11 @@ class Game:
             'hurt': [small_skeleton_frames[4], 4],
             'walk': [small_skeleton_frames[5], 4]
         }
-        # night borne
+
+    def load_night_borne_frames(self):
         night_borne_frames = tile_importer(23, 5, (170, 170),
-                                           join('..\\', 'static', 'images', 'NightBorn', 'NightBorne.png'))
-        self.night_borne_frames = {
+                                           'images/NightBorn/NightBorne.png')
+        return {
             'idle': [night_borne_frames[0], 9],
             'walk': [night_borne_frames[1], 6],
             'attack': [night_borne_frames[2], 12],
@@ -111,10 +186,10 @@ class Game:
             'teleport': [[night_borne_frames[2][2], night_borne_frames[4][13], night_borne_frames[4][14],
                           night_borne_frames[4][15], night_borne_frames[4][16]], 5]
         }
-        # necromancer
-        necromancer_frames = tile_importer(17, 7, (170, 170), join('..\\', 'static', 'images', 'Necromancer',
-                                                                   'necromancer.png'))
-        self.necromancer_frames = {
+
+    def load_necromancer_frames(self):
+        necromancer_frames = tile_importer(17, 7, (170, 170), 'images/Necromancer/necromancer.png')
+        return {
             'idle': [necromancer_frames[0], 8],
             'walk': [necromancer_frames[1], 8],
             'attack-1': [necromancer_frames[2], 13],
@@ -123,38 +198,41 @@ class Game:
             'hurt': [necromancer_frames[5], 5],
             'death': [necromancer_frames[6], 10]
         }
-        # goblin
+
+    def load_goblin_frames(self):
         goblin_frames = tile_importer(8, 1, (150, 150), (
-            (join('..\\', 'static', 'images', 'Goblin', 'Attack.png'), 8),
-            (join('..\\', 'static', 'images', 'Goblin', 'Death.png'), 4),
-            (join('..\\', 'static', 'images', 'Goblin', 'Idle.png'), 4),
-            (join('..\\', 'static', 'images', 'Goblin', 'Run.png'), 8),
-            (join('..\\', 'static', 'images', 'Goblin', 'Hurt.png'), 4)
+            ('images/Goblin/Attack.png', 8),
+            ('images/Goblin/Death.png', 4),
+            ('images/Goblin/Idle.png', 4),
+            ('images/Goblin/Run.png', 8),
+            ('images/Goblin/Hurt.png', 4)
         ), multiple_files=True)
-        self.goblin_frames = {
+        return {
             'attack': [goblin_frames[0], 8],
             'death': [goblin_frames[1], 4],
             'idle': [goblin_frames[2], 4],
             'walk': [goblin_frames[3], 8],
             'hurt': [goblin_frames[4], 4]
         }
-        # evil eye
+
+    def load_evil_eye_frames(self):
         evil_eye_frames = tile_importer(8, 1, (169, 169), (
-            (join('..\\', 'static', 'images', 'Evil eye', 'Attack.png'), 8),
-            (join('..\\', 'static', 'images', 'Evil eye', 'Death.png'), 4),
-            (join('..\\', 'static', 'images', 'Evil eye', 'Flight.png'), 8),
-            (join('..\\', 'static', 'images', 'Evil eye', 'Hurt.png'), 4)
+            ('images/Evil eye/Attack.png', 8),
+            ('images/Evil eye/Death.png', 4),
+            ('images/Evil eye/Flight.png', 8),
+            ('images/Evil eye/Hurt.png', 4)
         ), multiple_files=True)
-        self.evil_eye_frames = {
+        return {
             'attack': [evil_eye_frames[0], 8],
             'death': [evil_eye_frames[1], 4],
             'walk': [evil_eye_frames[2], 8],
             'hurt': [evil_eye_frames[3], 4]
         }
-        # demon slime
+
+    def load_demon_slime_frames(self):
         demon_slime_frames = tile_importer(22, 5, (300, 300),
-                                           join('..\\', 'static', 'images', 'DemonSlimeBoss', 'demon_king.png'))
-        self.demon_slime_frames = {
+                                           'images/DemonSlimeBoss/demon_king.png')
+        return {
             'idle': [demon_slime_frames[0], 6],
             'walk': [demon_slime_frames[1], 12],
             'attack': [demon_slime_frames[2], 15],
@@ -163,93 +241,225 @@ class Game:
         }
 
     def setup(self):
-        map = load_pygame(join('..\\', 'static', 'data', 'map.tmx'))
+        # compiled from map.tmx, tiles come already scaled
+        map = load_map()
         x_offset, y_offset = 150, 50
 
         # ground
-        scaled_value = 48
-        for x, y, image in map.get_layer_by_name('Ground').tiles():
-            image = pygame.transform.scale(image, (scaled_value, scaled_value))
-            Sprite(image, ((x * TILE_SIZE) + x_offset, (y * TILE_SIZE) + y_offset), self.all_sprites)
+        ground_tiles = []
+        floor_tiles = set()
+        for x, y, image in map.layer_tiles('Ground'):
+            floor_tiles.add((x, y))
+            ground_tiles.append((image, ((x * TILE_SIZE) + x_offset, (y * TILE_SIZE) + y_offset)))
+        self.all_sprites.ground_layer = StaticLayer(ground_tiles)
 
         # walls
-        for x, y, image in map.get_layer_by_name('Walls').tiles():
-            image = pygame.transform.scale(image, (scaled_value, scaled_value))
+        wall_tiles = set()
+        for x, y, image in map.layer_tiles('Walls'):
+            floor_tiles.discard((x, y))
+            wall_tiles.add((x, y))
             CollisionSprite(image, ((x * TILE_SIZE) + x_offset, (y * TILE_SIZE) + y_offset),
                             (self.all_sprites, self.collision_sprites))
 
-        for x, y, image in map.get_layer_by_name('Arena').tiles():
+        # chasers path around the walls over the open floor
+        self.enemy_sprites.navigation = Navigation(floor_tiles, wall_tiles, (x_offset, y_offset))
+
+        for x, y in map.arena:
             self.ground_locations.append(
-                (x * TILE_SIZE + x_offset + random.randint(15, 35), y * TILE_SIZE + y_offset + random.randint(15, 35)))
-
-        for player_spawn in map.get_layer_by_name('Player'):
-            self.player = Player((4368 + x_offset, 816 + y_offset), self.player_frames,
-                                 self.player_attack_frames,
-                                 self.collision_sprites,
-                                 self.enemy_sprites, self.player_attack_sprites,
-                                 (self.all_sprites, self.player_sprites))
-
-    def spawn(self, entity, frames):
-        pos = choice(self.ground_locations)
-        if entity == Necromancer:
-            return Necromancer(pos, frames, self.player, self.player_sprites, pos, self.collision_sprites,
-                               (self.all_sprites, self.enemy_sprites), self.necromancer_lasers,
-                               self.small_skeleton_frames)
-        elif entity == SmallSkeleton:
-            return SmallSkeleton(pos, frames, self.player, self.player_sprites, self.collision_sprites,
-                                 (self.all_sprites, self.enemy_sprites), False)
-        else:
-            return entity(pos, frames, self.player, self.player_sprites,
-                          self.collision_sprites, (self.all_sprites, self.enemy_sprites))
+                (x * TILE_SIZE + x_offset + rng.spawn.randint(15, 35), y * TILE_SIZE + y_offset + rng.spawn.randint(15, 35)))
+
+        # map.player_spawn is the Player layer's object, the game has always started the player further right
+        self.player = Player((4368 + x_offset, 816 + y_offset), self.player_frames,
+                             self.player_attack_frames,
+                             self.collision_sprites,
+                             self.enemy_sprites, self.player_attack_sprites,
+                             (self.all_sprites, self.player_sprites))
+
+    def spawn(self, archetype):
+        pos = rng.spawn.choice(self.ground_locations)
+        frames = self.enemy_assets.get(archetype.frames)
+        return ENEMY_CLASSES[archetype.kind].spawn(pos, frames, archetype, self)
+
+    def wave_frames(self, wave):
+        return [self.archetypes[enemy].frames for enemy in self.json_data['waves-data'][wave - 1]['data']]
 
     def play_the_wave(self):
         self.ui.wave_multiplier = 0
         self.ui.direction_up = True
         self.ui.play_the_animation = True
 
-        for enemy in self.json_data['waves-data'][self.current_wave - 1]['data']:
-            enemy_class = globals().get(enemy)
-            enemy_frames = None
-            match enemy:
-                case "Goblin":
-                    enemy_frames = self.goblin_frames
-                case "SmallSkeleton":
-                    enemy_frames = self.small_skeleton_frames
-                case "Necromancer":
-                    enemy_frames = self.necromancer_frames
-                case "Skeleton":
-                    enemy_frames = self.skeleton_frames
-                case "EvilEye":
-                    enemy_frames = self.evil_eye_frames
-                case "NightBorne":
-                    enemy_frames = self.night_borne_frames
-                case "DemonSlime":
-                    enemy_frames = self.demon_slime_frames
-
-            spawned_enemy = self.spawn(enemy_class, enemy_frames)
-            self.wave_enemies.add(spawned_enemy)
-
-    def run(self):
-        while self.running:
-            dt = self.clock.tick() / 1000
+        # the enemies themselves arrive over the next frames
+        self.wave_director.start(self.current_wave)
 
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    self.running = False
+        # slice the next wave's enemies while this one is being played
+        if self.current_wave < len(self.json_data['waves-data']):
+            self.enemy_assets.prefetch(self.wave_frames(self.current_wave + 1))
 
-            # update
+    def update(self, dt):
+        self.timers.update()
+        with self.profiler.section('ai'):
+            self.enemy_sprites.schedule_thinking(self.player)
+        if self.profiler.enabled:
+            self.profiler.update_sprites(self.all_sprites, dt)
+        else:
             self.all_sprites.update(dt)
-            if self.player.rect.centerx < 2910 + 150 and not self.game_started:
-                self.play_the_wave()
-                self.game_started = True
-            if not self.wave_enemies and self.game_started:
-                self.current_wave += 1
-                self.ui.wave += 1
-                self.play_the_wave()
-
-            # draw
+        with self.profiler.section('chase'):
+            self.enemy_sprites.navigation.update(self.player.hitbox_rect.center)
+            self.enemy_sprites.move_chasers(self.player, dt)
+        with self.profiler.section('combat'):
+            self.combat.update()
+        with self.profiler.section('spawn'):
+            self.wave_director.update()
+        if self.player.rect.centerx < 2910 + 150 and not self.game_started:
+            self.play_the_wave()
+            self.game_started = True
+        if self.wave_cleared() and self.game_started and not self.all_waves_cleared():
+            self.current_wave += 1
+            self.ui.wave += 1
+            self.play_the_wave()
+
+    def wave_cleared(self):
+        return not self.wave_enemies and not self.wave_director.queue
+
+    def all_waves_cleared(self):
+        return self.wave_cleared() and self.current_wave >= self.wave_limit
+
+    def draw(self):
+        if self.dirty_rects:
+            self.draw_dirty()
+            return
+
+        with self.profiler.section('draw'):
             self.screen.fill(color='black')
-            self.all_sprites.draw(self.player.rect.center)
+            self.all_sprites.draw(self.all_sprites.center(self.player))
+        with self.profiler.section('ui'):
             self.ui.draw()
+        self.profiler.draw()
+        with self.profiler.section('display'):
             pygame.display.update()
+
+    def draw_dirty(self):
+        # the world under last frame's hud is redrawn too, the hud itself is drawn every frame
+        with self.profiler.section('draw'):
+            changed = self.all_sprites.draw_dirty(self.all_sprites.center(self.player), self.hud_rects)
+        with self.profiler.section('ui'):
+            hud_rects = self.ui.draw()
+        overlay_rect = self.profiler.draw()
+        if overlay_rect:
+            hud_rects.append(overlay_rect)
+        with self.profiler.section('display'):
+            if changed is None:
+                pygame.display.update()
+            else:
+                pygame.display.update(changed + hud_rects)
+        self.hud_rects = hud_rects
+
+    def simulate(self, waves=None, dt=SIMULATION_DT, keys=None, max_frames=None):
+        # steps the game with a fixed dt as fast as the cpu allows, the player is driven by keys (idle by default)
+        self.player.get_keys = keys or ScriptedKeys
+        self.wave_limit = min(waves or len(self.json_data['waves-data']), len(self.json_data['waves-data']))
+        frames = 0
+
+        if not self.game_started:
+            self.play_the_wave()
+            self.game_started = True
+
+        # per wave: how long it took and how much health it cost
+        wave_stats = []
+        wave, wave_start, wave_health = self.current_wave, 0, self.player.health
+
+        def finish_wave(cleared):
+            wave_stats.append({
+                'wave': wave,
+                'cleared': cleared,
+                'time': (frames - wave_start) * dt,
+                'damage_taken': wave_health - self.player.health
+            })
+
+        while not self.player.is_dead and (max_frames is None or frames < max_frames):
+            if self.all_waves_cleared():
+                break
+            self.simulated_clock.advance(dt)
+            self.update(dt)
+            frames += 1
+
+            if self.current_wave != wave:
+                finish_wave(True)
+                wave, wave_start, wave_health = self.current_wave, frames, self.player.health
+        finish_wave(self.wave_cleared())
+
+        return {
+            'frames': frames,
+            'time': frames * dt,
+            'wave': self.current_wave,
+            'waves_cleared': self.current_wave if self.wave_cleared() else self.current_wave - 1,
+            'player_health': self.player.health,
+            'player_dead': self.player.is_dead,
+            'death_wave': self.current_wave if self.player.is_dead else None,
+            'waves': wave_stats
+        }
+
+    def replay(self):
+        # plays the recorded steps back as fast as the cpu allows, drawn unless headless
+        for keys in self.replay_steps:
+            self.player.get_keys = lambda keys=keys: keys
+            self.step(self.step_dt)
+            if not self.headless:
+                pygame.event.pump()
+                self.draw()
+
+        return {
+            'seed': self.seed,
+            'steps': len(self.replay_steps),
+            'time': len(self.replay_steps) * self.step_dt,
+            'wave': self.current_wave,
+            'player_pos': tuple(self.player.hitbox_rect.center),
+            'player_health': self.player.health,
+            'enemies': len(self.enemy_sprites)
+        }
+
+    def step(self, dt):
+        # one simulation step, the positions before it are kept to interpolate the drawing
+        self.all_sprites.snapshot()
+        self.simulated_clock.advance(dt)
+        self.update(dt)
+
+    def run(self):
+        # fixed simulation steps, as many as the real time since the last frame holds
+        # drawing blends between the last two steps by the time left over
+        accumulator = 0
+        while self.running:
+            # sleeps off the rest of the frame under the cap
+            accumulator += self.clock.tick(self.fps_cap) / 1000
+            self.profiler.begin_frame()
+
+            with self.profiler.section('input'):
+                for event in pygame.event.get():
+                    if event.type == pygame.QUIT:
+                        self.running = False
+                    if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                        self.profiler.toggle()
+                    if event.type == pygame.KEYDOWN and event.key == pygame.K_F4:
+                        print(f'profile written to {self.profiler.dump()}')
+
+            steps = 0
+            while accumulator >= self.step_dt:
+                # a frame too slow to catch up on drops the backlog, the game slows down instead of spiralling
+                if steps == MAX_SIMULATION_STEPS:
+                    accumulator %= self.step_dt
+                    break
+                if self.recorder:
+                    # the player reads back exactly what went into the file, so a replay takes the same path
+                    keys = self.recorder.record(pygame.key.get_pressed())
+                    self.player.get_keys = lambda: keys
+                self.step(self.step_dt)
+                accumulator -= self.step_dt
+                steps += 1
+
+            self.all_sprites.alpha = accumulator / self.step_dt
+            self.draw()
+            self.profiler.end_frame()
+        if self.recorder:
+            self.recorder.close()
+        self.enemy_assets.shutdown()
         pygame.quit()
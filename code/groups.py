@@ -1,20 +1,241 @@
+import numpy as np
+
 from settings import *
 
 
 class AllSprites(pygame.sprite.Group):
-    def __init__(self):
+    def __init__(self, collision_sprites):
         super().__init__()
         self.surface = pygame.display.get_surface()
         self.offset = pygame.math.Vector2()
+        self.ground_layer = None
 
-    def draw(self, target_pos):
+        # the walls never move, the camera finds them through the collision grid
+        self.collision_sprites = collision_sprites
+
+        # dirty rect mode: sprite -> (image, screen rect) as drawn last frame, and that frame's camera offset
+        self.drawn = {}
+        self.drawn_offset = None
+
+        # sprites that can move, and where they were before the last simulation step
+        self.moving_sprites = {}
+        self.previous = {}
+        self.alpha = 1
+
+    def add_internal(self, sprite, layer=None):
+        super().add_internal(sprite, layer)
+        if not hasattr(sprite, 'static'):
+            self.moving_sprites[sprite] = None
+
+    def remove_internal(self, sprite):
+        super().remove_internal(sprite)
+        self.moving_sprites.pop(sprite, None)
+
+    def snapshot(self):
+        # called before every simulation step, drawing blends from these positions to the new ones
+        self.previous = {sprite: sprite.rect.topleft for sprite in self.moving_sprites}
+
+    def position(self, sprite):
+        # topleft between the last two simulation steps, alpha is how far the render time is past the older one
+        x, y = sprite.rect.topleft
+        previous = self.previous.get(sprite)
+        # a sprite that appeared or jumped (teleports, pooled lasers) is drawn where it is
+        if previous is None or abs(x - previous[0]) + abs(y - previous[1]) > TILE_SIZE:
+            return x, y
+        return previous[0] + (x - previous[0]) * self.alpha, previous[1] + (y - previous[1]) * self.alpha
+
+    def center(self, sprite):
+        x, y = self.position(sprite)
+        return x + sprite.rect.width / 2, y + sprite.rect.height / 2
+
+    def visible_sprites(self, target_pos):
         self.offset.x = -(target_pos[0] - WINDOW_WIDTH / 2)
         self.offset.y = -(target_pos[1] - WINDOW_HEIGHT / 2)
+        view_rect = pygame.FRect(-self.offset.x, -self.offset.y, WINDOW_WIDTH, WINDOW_HEIGHT)
+
+        # y sorting, only for what the camera sees
+        sprites = self.collision_sprites.near(view_rect) + list(self.moving_sprites)
+        visible_sprites = view_rect.collideobjectsall(sprites, key=lambda sprite: sprite.rect)
+        return sorted(visible_sprites, key=lambda sprite: sprite.rect.centery)
+
+    def draw(self, target_pos):
+        sprites = self.visible_sprites(target_pos)
+
+        # pre-baked ground chunks
+        if self.ground_layer:
+            self.ground_layer.draw(self.offset)
+
+        for sprite in sprites:
+            x, y = self.position(sprite)
+            self.surface.blit(sprite.image, (x + self.offset.x, y + self.offset.y))
+
+    def draw_dirty(self, target_pos, dirty_rects):
+        # redraws only the screen rects that changed since the last frame, plus dirty_rects
+        # returns those rects, or None when the camera moved and the whole screen was redrawn
+        sprites = self.visible_sprites(target_pos)
+        drawn = {}
+        positions = []
+        for sprite in sprites:
+            x, y = self.position(sprite)
+            positions.append((x + self.offset.x, y + self.offset.y))
+            rect = sprite.image.get_rect(topleft=positions[-1])
+            drawn[sprite] = (sprite.image, rect.inflate(2, 2))
+
+        if self.drawn_offset != tuple(self.offset):
+            self.surface.fill('black')
+            if self.ground_layer:
+                self.ground_layer.draw(self.offset)
+            for sprite, position in zip(sprites, positions):
+                self.surface.blit(sprite.image, position)
+            self.drawn, self.drawn_offset = drawn, tuple(self.offset)
+            return None
+
+        # where a sprite was and where it is now, for every sprite that moved, animated, appeared or left
+        changed = [pygame.Rect(rect) for rect in dirty_rects]
+        for sprite, (image, rect) in drawn.items():
+            last = self.drawn.get(sprite)
+            if last is None:
+                changed.append(rect)
+            elif last[0] is not image or last[1] != rect:
+                changed += [last[1], rect]
+        changed += [rect for sprite, (image, rect) in self.drawn.items() if sprite not in drawn]
+        self.drawn = drawn
+
+        # overlapping rects are merged so nothing gets blitted twice
+        merged = []
+        for rect in changed:
+            rect = rect.clip(self.surface.get_rect())
+            if not rect:
+                continue
+            index = rect.collidelist(merged)
+            while index != -1:
+                rect.union_ip(merged.pop(index))
+                index = rect.collidelist(merged)
+            merged.append(rect)
+
+        sprite_rects = [rect for image, rect in drawn.values()]
+        for rect in merged:
+            self.surface.set_clip(rect)
+            self.surface.fill('black', rect)
+            if self.ground_layer:
+                self.ground_layer.draw(self.offset)
+            for index in rect.collidelistall(sprite_rects):
+                self.surface.blit(sprites[index].image, positions[index])
+        self.surface.set_clip(None)
+        return merged
+
+
+class CollisionSprites(pygame.sprite.Group):
+    # walls are bucketed into a uniform grid, so movement only tests the walls under a hitbox
+    def __init__(self, cell_size=TILE_SIZE):
+        super().__init__()
+        self.cell_size = cell_size
+        self.grid = {}
+
+    def cells(self, rect):
+        left, top = int(rect.left // self.cell_size), int(rect.top // self.cell_size)
+        right, bottom = int(rect.right // self.cell_size), int(rect.bottom // self.cell_size)
+        for x in range(left, right + 1):
+            for y in range(top, bottom + 1):
+                yield x, y
+
+    def add_internal(self, sprite, layer=None):
+        super().add_internal(sprite, layer)
+        for cell in self.cells(sprite.rect):
+            self.grid.setdefault(cell, []).append(sprite)
+
+    def remove_internal(self, sprite):
+        super().remove_internal(sprite)
+        for cell in self.cells(sprite.rect):
+            if sprite in self.grid.get(cell, ()):
+                self.grid[cell].remove(sprite)
+
+    def near(self, rect):
+        # dict keeps insertion order and drops walls spanning several cells
+        return list(dict.fromkeys(sprite for cell in self.cells(rect) for sprite in self.grid.get(cell, ())))
+
+
+class EnemySprites(pygame.sprite.Group):
+    # chasers (classes with a chase_offset) are moved together in move_chasers, once per frame
+    def __init__(self):
+        super().__init__()
+        self.chasers = {}
+        # (chasers, speeds, chase offsets, hitbox half sizes, clearances) as arrays in the order of chasers
+        self.chaser_stats = None
+        self.navigation = None
+        # where the off screen round robin continues next step
+        self.think_cursor = 0
+
+    def add_internal(self, sprite, layer=None):
+        super().add_internal(sprite, layer)
+        if hasattr(sprite, 'chase_offset'):
+            self.chasers[sprite] = None
+            self.chaser_stats = None
+
+    def remove_internal(self, sprite):
+        super().remove_internal(sprite)
+        if sprite in self.chasers:
+            del self.chasers[sprite]
+            self.chaser_stats = None
+
+    def schedule_thinking(self, player):
+        # enemies around the camera decide every step, the others take turns, AI_BACKGROUND_THINKS per step
+        # so the cost of decisions stays flat however many enemies wait off screen
+        view_rect = pygame.FRect(0, 0, WINDOW_WIDTH + AI_VIEW_MARGIN * 2, WINDOW_HEIGHT + AI_VIEW_MARGIN * 2)
+        view_rect.center = player.rect.center
+        enemies = self.sprites()
+        near = view_rect.collideobjectsall(enemies, key=lambda sprite: sprite.hitbox_rect)
+        for enemy in near:
+            enemy.think_due = True
+
+        if len(near) < len(enemies):
+            near = set(near)
+            far = [enemy for enemy in enemies if enemy not in near]
+            for index in range(self.think_cursor, self.think_cursor + min(AI_BACKGROUND_THINKS, len(far))):
+                far[index % len(far)].think_due = True
+            self.think_cursor = (self.think_cursor + AI_BACKGROUND_THINKS) % len(far)
+
+    def chaser_arrays(self):
+        # what never changes about the chasers, rebuilt when one joins or leaves the group
+        chasers = list(self.chasers)
+        stats = np.array([(enemy.speed, *enemy.chase_offset, *enemy.hitbox_rect.size) for enemy in chasers],
+                         dtype=float).reshape(-1, 5)
+        speeds, offsets, half_sizes = stats[:, 0], stats[:, 1:3], stats[:, 3:5] / 2
+        clearances = np.array([self.navigation.clearance_for(*size) for size in stats[:, 3:5].tolist()], dtype=int)
+        self.chaser_stats = chasers, speeds, offsets, half_sizes, clearances
+
+    def move_chasers(self, player, dt):
+        # every chaser's direction, step and wall push in one pass over arrays,
+        # the only work left per enemy is copying its position in and out of its pygame rects
+        if not self.chasers:
+            return
+        if self.chaser_stats is None:
+            self.chaser_arrays()
+        chasers, speeds, offsets, half_sizes, clearances = self.chaser_stats
+        state = np.array([(*enemy.hitbox_rect.center, enemy.chasing, enemy.moving) for enemy in chasers], dtype=float)
+        positions = state[:, :2]
+        chasing = state[:, 2] > 0
+        moving = chasing & (state[:, 3] > 0)
+
+        # around the walls along the flow field for its size, straight at the player once it is a tile away
+        directions = np.zeros_like(positions)
+        flowing = np.zeros(len(chasers), dtype=bool)
+        for clearance in np.unique(clearances[chasing]).tolist():
+            sized = chasing & (clearances == clearance)
+            directions[sized], flowing[sized] = self.navigation.field(clearance).directions(positions[sized])
+        straight = chasing & ~flowing
+        directions[straight] = np.array(player.rect.center, dtype=float) + offsets[straight] - positions[straight]
+        lengths = np.hypot(directions[:, 0], directions[:, 1])
+        straight &= lengths > 0
+        directions[straight] /= lengths[straight, None]
 
-        # y sorting
-        ground_sprites = [sprite for sprite in self if hasattr(sprite, 'ground')]
-        object_sprites = [sprite for sprite in self if not hasattr(sprite, 'ground')]
+        positions[moving] += directions[moving] * (speeds[moving, None] * dt)
+        positions[moving] += self.navigation.push_out(positions[moving], half_sizes[moving])
 
-        for layer in [ground_sprites, object_sprites]:
-            for sprite in sorted(layer, key=lambda sprite: sprite.rect.centery):
-                self.surface.blit(sprite.image, sprite.rect.topleft + self.offset)
+        for enemy, is_chasing, is_moving, direction, position in zip(
+                chasers, chasing.tolist(), moving.tolist(), directions.tolist(), positions.tolist()):
+            if is_chasing:
+                enemy.direction.update(direction)
+            if is_moving:
+                enemy.hitbox_rect.center = position
+                enemy.rect.center = position
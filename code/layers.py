@@ -0,0 +1,39 @@
+from settings import *
+
+
+class StaticLayer:
+    # bakes static tiles into big chunk surfaces once, so drawing the layer is a handful of blits
+    def __init__(self, tiles, chunk_size=CHUNK_SIZE):
+        self.surface = pygame.display.get_surface()
+        self.chunk_px = chunk_size * TILE_SIZE
+        self.chunks = {}
+
+        tiles = list(tiles)
+        if not tiles:
+            self.origin = pygame.Vector2()
+            return
+        self.origin = pygame.Vector2(min(pos[0] for _, pos in tiles), min(pos[1] for _, pos in tiles))
+
+        for image, pos in tiles:
+            local_x, local_y = pos[0] - self.origin.x, pos[1] - self.origin.y
+            key = (int(local_x // self.chunk_px), int(local_y // self.chunk_px))
+            if key not in self.chunks:
+                self.chunks[key] = pygame.Surface((self.chunk_px, self.chunk_px), pygame.SRCALPHA).convert_alpha()
+            self.chunks[key].blit(image, (local_x - key[0] * self.chunk_px, local_y - key[1] * self.chunk_px))
+
+    def chunk_pos(self, key):
+        return self.origin.x + key[0] * self.chunk_px, self.origin.y + key[1] * self.chunk_px
+
+    def draw(self, offset):
+        # only the chunks overlapping the camera
+        left = int((-offset.x - self.origin.x) // self.chunk_px)
+        top = int((-offset.y - self.origin.y) // self.chunk_px)
+        right = int((-offset.x + WINDOW_WIDTH - self.origin.x) // self.chunk_px)
+        bottom = int((-offset.y + WINDOW_HEIGHT - self.origin.y) // self.chunk_px)
+
+        for x in range(left, right + 1):
+            for y in range(top, bottom + 1):
+                chunk = self.chunks.get((x, y))
+                if chunk is not None:
+                    chunk_x, chunk_y = self.chunk_pos((x, y))
+                    self.surface.blit(chunk, (chunk_x + offset.x, chunk_y + offset.y))
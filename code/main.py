@@ -1,5 +1,27 @@
+import argparse
+
 from game import Game
+from settings import FPS_CAP
 
 if __name__ == '__main__':
-    game = Game()
-    game.run()
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--headless', action='store_true', help='simulate the waves without a window, music or drawing')
+    parser.add_argument('--waves', type=int, help='how many waves to simulate in headless mode')
+    parser.add_argument('--dirty-rects', action='store_true',
+                        help='only redraw the parts of the screen that changed while the camera stands still')
+    parser.add_argument('--fps', type=int, default=FPS_CAP, help='frames drawn per second at most, 0 for no cap')
+    parser.add_argument('--vsync', action='store_true', help='pace frames to the display refresh rate')
+    parser.add_argument('--seed', type=int, help='seed of the spawn, combat and ai random streams')
+    parser.add_argument('--record', metavar='PATH', help='write the input of every simulation step of this session to PATH')
+    parser.add_argument('--replay', metavar='PATH',
+                        help='play a recorded session back as fast as possible, without a window with --headless')
+    args = parser.parse_args()
+
+    game = Game(headless=args.headless, dirty_rects=args.dirty_rects, seed=args.seed, record=args.record,
+                replay=args.replay, fps_cap=args.fps, vsync=args.vsync)
+    if args.replay:
+        print(game.replay())
+    elif args.headless:
+        print(game.simulate(args.waves))
+    else:
+        game.run()
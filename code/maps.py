@@ -0,0 +1,132 @@
+import mmap
+import os
+import struct
+from array import array
+
+from settings import *
+import resources
+
+# the game reads a compiled map instead of parsing the tmx and its tileset with pytmx on every launch
+# compile it ahead of time with `python maps.py`, a missing or outdated one is compiled on first launch
+# an asset bundle carries it compiled already
+
+# header: magic, version, map width and height in tiles, tile size in pixels, tile image count,
+#         layer count, arena point count, player spawn
+# body: every tile image as BGRA pixels, already scaled, one after the other
+#       every layer as a 16 byte name and width * height uint16 tile numbers, row by row, 0 for no tile
+#       every arena point as two uint16 tile coordinates
+HEADER = struct.Struct('<4sBHHHHBHii')
+LAYER_NAME = struct.Struct('<16s')
+MAGIC = b'DGMP'
+VERSION = 1
+# layers that are drawn, the Arena layer only marks where enemies may spawn
+TILE_LAYERS = ('Ground', 'Walls')
+
+
+class CompiledMap:
+    def __init__(self, data):
+        magic, version, self.width, self.height, self.tile_size, tile_count, layer_count, arena_count, \
+            spawn_x, spawn_y = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f'not a version {VERSION} compiled map')
+        self.player_spawn = (spawn_x, spawn_y)
+
+        # every tile image is a view into one sheet made straight from the file's bytes
+        offset = HEADER.size
+        tile_bytes = self.tile_size * self.tile_size * 4
+        sheet = pygame.image.frombuffer(memoryview(data)[offset:offset + tile_count * tile_bytes],
+                                        (self.tile_size, self.tile_size * tile_count), 'BGRA')
+        self.tiles = [sheet.subsurface(0, index * self.tile_size, self.tile_size, self.tile_size)
+                      for index in range(tile_count)]
+        offset += tile_count * tile_bytes
+
+        self.layers = {}
+        layer_size = self.width * self.height * 2
+        for _ in range(layer_count):
+            name = LAYER_NAME.unpack_from(data, offset)[0].rstrip(b'\0').decode()
+            offset += LAYER_NAME.size
+            self.layers[name] = memoryview(data)[offset:offset + layer_size].cast('H')
+            offset += layer_size
+
+        points = memoryview(data)[offset:offset + arena_count * 4].cast('H')
+        self.arena = [(points[index], points[index + 1]) for index in range(0, len(points), 2)]
+
+    def layer_tiles(self, name):
+        # (x, y, image) of every tile of a layer, row by row like pytmx's layer.tiles()
+        numbers, width = self.layers[name], self.width
+        for index, number in enumerate(numbers):
+            if number:
+                yield index % width, index // width, self.tiles[number - 1]
+
+
+def compile_map(source=MAP_SOURCE, tile_size=TILE_SIZE):
+    # -> the compiled map's bytes, needs pytmx and a display to convert the tileset on
+    from pytmx import load_pygame
+
+    tmx = load_pygame(source)
+    # pytmx shares one image per tile id, each is scaled and stored once
+    numbers = {}
+    tiles = []
+    layers = b''
+    for name in TILE_LAYERS:
+        layer = array('H', bytes(tmx.width * tmx.height * 2))
+        for x, y, image in tmx.get_layer_by_name(name).tiles():
+            if image not in numbers:
+                # drawn onto a transparent tile, so colorkeyed and opaque tiles come out the same in BGRA
+                tile = pygame.Surface((tile_size, tile_size), pygame.SRCALPHA)
+                tile.blit(pygame.transform.scale(image, (tile_size, tile_size)), (0, 0))
+                tiles.append(tile)
+                numbers[image] = len(tiles)
+            layer[y * tmx.width + x] = numbers[image]
+        layers += LAYER_NAME.pack(name.encode()) + layer.tobytes()
+
+    arena = [(x, y) for x, y, image in tmx.get_layer_by_name('Arena').tiles()]
+    spawn = next(iter(tmx.get_layer_by_name('Player')))
+
+    header = HEADER.pack(MAGIC, VERSION, tmx.width, tmx.height, tile_size, len(tiles), len(TILE_LAYERS), len(arena),
+                         int(spawn.x), int(spawn.y))
+    pixels = b''.join(pygame.image.tobytes(tile, 'BGRA') for tile in tiles)
+    return header + pixels + layers + array('H', [value for point in arena for value in point]).tobytes()
+
+
+def save_map(path, data):
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path + '.tmp', 'wb') as file:
+            file.write(data)
+        os.replace(path + '.tmp', path)
+    except OSError:
+        # read-only install, compile again next launch
+        pass
+
+
+def map_outdated(path):
+    try:
+        compiled = os.path.getmtime(path)
+    except OSError:
+        return True
+    return any(os.path.getmtime(source) > compiled for source in MAP_SOURCES)
+
+
+def load_map(path=MAP_PATH, use_mmap=False):
+    # one read of the whole file, or a copy on write mapping that only pages in what is touched
+    if resources.bundle and resources.COMPILED_MAP in resources.bundle.index:
+        return CompiledMap(resources.bundle.view(resources.COMPILED_MAP))
+    if map_outdated(path):
+        data = compile_map()
+        save_map(path, data)
+        return CompiledMap(data)
+
+    with open(path, 'rb') as file:
+        if use_mmap:
+            return CompiledMap(mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_COPY))
+        return CompiledMap(file.read())
+
+
+if __name__ == '__main__':
+    # usage: python maps.py
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    pygame.init()
+    pygame.display.set_mode((1, 1))
+    save_map(MAP_PATH, compile_map())
+    print(f'{MAP_SOURCE} compiled to {MAP_PATH}')
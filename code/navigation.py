@@ -0,0 +1,183 @@
+from math import ceil
+
+import numpy as np
+
+from settings import *
+
+# the eight tiles around a tile, straight ones first
+AROUND = ((1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (1, -1), (-1, 1), (-1, -1))
+STEPS_X = np.array([step_x for step_x, step_y in AROUND])
+STEPS_Y = np.array([step_y for step_x, step_y in AROUND])
+
+
+def neighbour(grid, step_x, step_y):
+    # grid[x + step_x, y + step_y] at every (x, y), grids keep a ring of empty tiles so nothing wraps into the map
+    return np.roll(grid, (-step_x, -step_y), axis=(0, 1))
+
+
+class FlowField:
+    # every walkable tile points at its neighbour one step closer to the player
+    # rebuilt with a single breadth first search whenever the player enters another tile,
+    # the search moves its whole frontier one step at a time with array operations
+    def __init__(self, walkable, floor, origin, tile_size=TILE_SIZE):
+        self.walkable = walkable
+        self.origin = np.array(origin, dtype=float)
+        self.tile_size = tile_size
+        self.target = None
+        self.tiles_x, self.tiles_y = np.indices(walkable.shape)
+
+        # direction -> tiles that may step that way, diagonals only when both tiles beside the corner are walkable
+        # too, then a body that fits on each of the four tiles also fits everywhere between them
+        self.can_step = [walkable & neighbour(walkable, step_x, step_y) &
+                         neighbour(walkable, step_x, 0) & neighbour(walkable, 0, step_y) for step_x, step_y in AROUND]
+        self.can_step_flat = [can_step.ravel() for can_step in self.can_step]
+        self.step_offsets = [step_x * walkable.shape[1] + step_y for step_x, step_y in AROUND]
+        # of two equally short ways the one away from the walls wins
+        self.hugs_wall = sum(self.can_step) < 8
+
+        # floor tile off the field -> the closest walkable tile, where a body standing too close to a wall heads first
+        # -1 off the floor
+        self.entry_x = np.where(walkable, self.tiles_x, -1)
+        self.entry_y = np.where(walkable, self.tiles_y, -1)
+        missing = floor & ~walkable
+        found = missing
+        while found.any():
+            found = np.zeros(walkable.shape, dtype=bool)
+            for step_x, step_y in AROUND:
+                entry_x, entry_y = neighbour(self.entry_x, step_x, step_y), neighbour(self.entry_y, step_x, step_y)
+                reached = missing & (entry_x >= 0)
+                self.entry_x[reached], self.entry_y[reached] = entry_x[reached], entry_y[reached]
+                missing &= ~reached
+                found |= reached
+
+        # tile -> steps to the player (-1 where the player can not be reached from), and the next tile on the way
+        self.distances = np.full(walkable.shape, -1)
+        self.next_x = self.entry_x.copy()
+        self.next_y = self.entry_y.copy()
+
+    def tile(self, pos):
+        return tuple(((np.asarray(pos) - self.origin) // self.tile_size).astype(int))
+
+    def update(self, target_pos):
+        # a player standing where the body does not fit is chased from the closest tile it does fit on
+        x, y = np.clip(self.tile(target_pos), 0, np.array(self.walkable.shape) - 1)
+        target = self.entry_x[x, y], self.entry_y[x, y]
+        if target == self.target or target[0] < 0:
+            return
+        self.target = target
+
+        # tiles as flat indices, each step only touches the tiles on the frontier
+        distances = np.full(self.walkable.size, -1)
+        frontier = np.array([np.ravel_multi_index(target, self.walkable.shape)])
+        distances[frontier] = 0
+        distance = 0
+        while len(frontier):
+            distance += 1
+            reached = np.concatenate([frontier[can_step[frontier]] + offset
+                                      for can_step, offset in zip(self.can_step_flat, self.step_offsets)])
+            frontier = np.unique(reached[distances[reached] < 0])
+            distances[frontier] = distance
+        self.distances = distances.reshape(self.walkable.shape)
+
+        # every walkable tile picks its closest neighbour, away from the walls on a tie, the rest head for their entry
+        unreachable = self.distances.size
+        keys = []
+        for (step_x, step_y), can_step in zip(AROUND, self.can_step):
+            distances = neighbour(self.distances, step_x, step_y)
+            key = np.where(distances >= 0, distances, unreachable) * 2 + neighbour(self.hugs_wall, step_x, step_y)
+            keys.append(np.where(can_step, key, np.inf))
+        best = np.argmin(keys, axis=0)
+        self.next_x = np.where(self.walkable, self.tiles_x + STEPS_X[best], self.entry_x)
+        self.next_y = np.where(self.walkable, self.tiles_y + STEPS_Y[best], self.entry_y)
+
+    def directions(self, positions):
+        # unit vectors toward the centre of each position's next tile, a body centred on a walkable tile touches no wall
+        # and which of them hold one, not those off the floor or next to the player, callers steer straight at it then
+        tiles = ((positions - self.origin) // self.tile_size).astype(int)
+        tiles_x = np.clip(tiles[:, 0], 0, self.walkable.shape[0] - 1)
+        tiles_y = np.clip(tiles[:, 1], 0, self.walkable.shape[1] - 1)
+        entry_x, entry_y = self.entry_x[tiles_x, tiles_y], self.entry_y[tiles_x, tiles_y]
+        flowing = (entry_x >= 0) & (self.distances[entry_x, entry_y] > 1)
+
+        next_tiles = np.stack([self.next_x[tiles_x, tiles_y], self.next_y[tiles_x, tiles_y]], axis=1)
+        directions = self.origin + (next_tiles + 0.5) * self.tile_size - positions
+        lengths = np.hypot(directions[:, 0], directions[:, 1])
+        flowing &= lengths > 0
+        directions[flowing] /= lengths[flowing, None]
+        return directions, flowing
+
+
+class Navigation:
+    # the tile map as the chasers see it: a flow field per body size and the walls they are pushed out of
+    # grids are indexed [x, y] with a ring of empty tiles around the map, origin is the ring's top left corner
+    def __init__(self, floor, walls, origin, tile_size=TILE_SIZE):
+        width = max(x for x, y in walls) + 3
+        height = max(y for x, y in walls) + 3
+        self.floor = np.zeros((width, height), dtype=bool)
+        self.floor[tuple(np.array(list(floor)).T + 1)] = True
+        self.walls = np.zeros((width, height), dtype=bool)
+        self.walls[tuple(np.array(list(walls)).T + 1)] = True
+        self.origin = np.array(origin, dtype=float) - tile_size
+        self.tile_size = tile_size
+
+        # tile -> how many rings of floor surround it, 0 next to a wall or off the map, -1 off the floor
+        self.clearance = np.full((width, height), -1)
+        room, rings = self.floor, 0
+        while room.any():
+            self.clearance[room] = rings
+            room = room & (sum(neighbour(room, step_x, step_y) for step_x, step_y in AROUND) == 8)
+            rings += 1
+
+        # side (left, right, up, down) -> wall tiles whose side faces open floor, a body only leaves a wall that way
+        self.open_sides = np.stack([self.walls & ~neighbour(self.walls, step_x, step_y)
+                                    for step_x, step_y in ((-1, 0), (1, 0), (0, -1), (0, 1))])
+        # clearance -> FlowField, made the first time a body that size chases
+        self.fields = {}
+        self.target_pos = None
+
+    def clearance_for(self, width, height):
+        # rings of floor a body needs around the tile its centre stands on
+        return max(0, ceil((max(width, height) / 2 - self.tile_size / 2) / self.tile_size))
+
+    def field(self, clearance):
+        if clearance not in self.fields:
+            self.fields[clearance] = FlowField(self.clearance >= clearance, self.floor, self.origin, self.tile_size)
+            if self.target_pos is not None:
+                self.fields[clearance].update(self.target_pos)
+        return self.fields[clearance]
+
+    def update(self, target_pos):
+        self.target_pos = target_pos
+        for field in self.fields.values():
+            field.update(target_pos)
+
+    def push_out(self, centers, half_sizes):
+        # (x, y) per body that moves it out of the walls it overlaps, each wall pushes it out the shortest way
+        # through one of its sides that face open floor, so a body is never shoved into the wall behind
+        size = self.tile_size
+        lefts, tops = (centers - half_sizes - self.origin).T
+        rights, bottoms = (centers + half_sizes - self.origin).T
+        # every tile under each body, as a span x span block from the top left one
+        span = int(half_sizes.max(initial=0) * 2 // size) + 2
+        offsets = np.arange(span)
+        tiles_x = (lefts // size).astype(int)[:, None, None] + offsets[None, :, None]
+        tiles_y = (tops // size).astype(int)[:, None, None] + offsets[None, None, :]
+        grid_x = np.clip(tiles_x, 0, self.walls.shape[0] - 1)
+        grid_y = np.clip(tiles_y, 0, self.walls.shape[1] - 1)
+
+        lefts, tops = lefts[:, None, None], tops[:, None, None]
+        rights, bottoms = rights[:, None, None], bottoms[:, None, None]
+        wall_lefts, wall_tops = tiles_x * size, tiles_y * size
+        overlapping = self.walls[grid_x, grid_y] & \
+            (np.minimum(rights, wall_lefts + size) > np.maximum(lefts, wall_lefts)) & \
+            (np.minimum(bottoms, wall_tops + size) > np.maximum(tops, wall_tops))
+
+        # side -> how far the body has to move to leave the wall through it
+        distances = np.stack(np.broadcast_arrays(rights - wall_lefts, wall_lefts + size - lefts,
+                                                 bottoms - wall_tops, wall_tops + size - tops))
+        distances = np.where(self.open_sides[:, grid_x, grid_y], distances, np.inf)
+        sides = np.argmin(distances, axis=0)
+        distance = np.min(distances, axis=0)
+        overlapping &= np.isfinite(distance)
+        pushes = [np.where(overlapping & (sides == side), distance, 0).max(axis=(1, 2)) for side in range(4)]
+        return np.stack([pushes[1] - pushes[0], pushes[3] - pushes[2]], axis=1)
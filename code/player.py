@@ -4,11 +4,21 @@ import pygame.sprite
 from pygame import K_d, K_a, K_w, K_s, K_SPACE, K_f, K_e, Vector2
 
 from timers import Timer
+from support import flip_frame, frame_mask
 from settings import *
-from random import choice
+import rng
 from enemies import Skeleton, Goblin, DemonSlime
 
 
+class ScriptedKeys:
+    # stands in for pygame.key.get_pressed when nobody is at the keyboard
+    def __init__(self, pressed=()):
+        self.pressed = set(pressed)
+
+    def __getitem__(self, key):
+        return key in self.pressed
+
+
 # noinspection PyTypeChecker
 
 class Player(pygame.sprite.Sprite):
@@ -30,6 +40,9 @@ class Player(pygame.sprite.Sprite):
         # group containing every enemy in the game
         self.enemy_sprites = enemy_sprites
 
+        # input, replaceable by scripted keys in headless runs
+        self.get_keys = pygame.key.get_pressed
+
         # movement
         self.direction = pygame.Vector2()
         self.speed = 750
@@ -65,6 +78,10 @@ class Player(pygame.sprite.Sprite):
             'ranged': Timer(1500, func=lambda: self.allow_attack('ranged'))
         }
 
+    @property
+    def mask(self):
+        return frame_mask(self.image)
+
     def allow_attack(self, attack_type):
         self.can_attack[attack_type] = True
 
@@ -75,8 +92,8 @@ class Player(pygame.sprite.Sprite):
 
         # methods
         def animate_state(looped=False, func=None):
-            self.image = pygame.transform.flip(
-                self.frames[self.state][0][int(self.frame_index % self.frames[self.state][1])], self.flip, False)
+            self.image = flip_frame(self.frames[self.state][0][int(self.frame_index % self.frames[self.state][1])],
+                                    self.flip)
             if not looped and func:
                 if self.frame_index > self.frames[self.state][1] - 0.1:
                     func()
@@ -107,7 +124,7 @@ class Player(pygame.sprite.Sprite):
 
     def input(self):
         # movement
-        keys = pygame.key.get_pressed()
+        keys = self.get_keys()
         self.direction.x = int(keys[K_d]) - int(keys[K_a])
         self.direction.y = int(keys[K_s]) - int(keys[K_w])
         self.direction = self.direction.normalize() if self.direction else self.direction
@@ -154,7 +171,7 @@ class Player(pygame.sprite.Sprite):
         self.rect.center = self.hitbox_rect.center
 
     def collisions(self, movement):
-        for sprite in self.collision_sprites:
+        for sprite in self.collision_sprites.near(self.hitbox_rect):
             if sprite.rect.colliderect(self.hitbox_rect):
                 if movement == 'horizontal':
                     if self.direction.x > 0:
@@ -175,8 +192,6 @@ class Player(pygame.sprite.Sprite):
     def update(self, dt):
         if not self.is_dead:
             self.hitbox_rect = self.rect.inflate(self.x_inflate, self.y_inflate)
-            for timer in self.attack_timers.values():
-                timer.update()
 
             self.input()
             self.move(dt)
@@ -189,7 +204,7 @@ class PlayerAttackEffect(pygame.sprite.Sprite):
         super().__init__(groups)
         self.player = player
         self.frames, self.frame_index = frames, 0
-        self.image = pygame.transform.flip(self.frames[self.frame_index], self.player.flip, False)
+        self.image = flip_frame(self.frames[self.frame_index], self.player.flip)
         self.rect = self.image.get_frect(topleft=pos)
         self.enemy_sprites = enemy_sprites
         self.attack_sprites = attack_sprites
@@ -198,48 +213,36 @@ class PlayerAttackEffect(pygame.sprite.Sprite):
         self.pos = pos
         self.offset = offset
 
+    @property
+    def mask(self):
+        return frame_mask(self.image)
+
     def animate(self, dt):
         animation_speed = 9
         if self.player.state == 'heavy-attack':
             animation_speed = 8
 
         self.frame_index += animation_speed * dt
-        self.image = pygame.transform.flip(self.frames[int(self.frame_index)], self.player.flip, False)
+        self.image = flip_frame(self.frames[int(self.frame_index)], self.player.flip)
         if self.frame_index > 1.4:
             self.kill()
 
         self.rect.topleft = self.player.rect.center + self.offset
 
-    def collisions(self):
-        for sprite in self.enemy_sprites:
-            if sprite.is_dead and not sprite.is_out:
-                sprite.death_timer.activate()
-                sprite.is_out = True
-
-            if pygame.sprite.spritecollide(sprite, self.attack_sprites, False,
-                                           pygame.sprite.collide_mask) and self.can_hit:
-                if not sprite.is_dead:
-                    self.attack(sprite)
-                    self.can_hit = False
-                    self.attack_cooldown_timer.activate()
-
     def attack(self, target):
         if not type(target) == DemonSlime:
             target.state = 'hurt'
             target.frame_index = 0
 
-        dodge = choice([0, 0, 0, 0, 1])
+        dodge = rng.combat.choice([0, 0, 0, 0, 1])
         target.dodge = dodge
 
-        if dodge == 1 and type(target) == Skeleton:
-            print('dodged')
-        else:
+        # skeletons dodge one hit in five
+        if not (dodge == 1 and type(target) == Skeleton):
             target.health -= self.player.damage
 
     def allow_attack(self):
         self.can_hit = True
 
     def update(self, dt):
-        self.attack_cooldown_timer.update()
         self.animate(dt)
-        self.collisions()
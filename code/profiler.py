@@ -0,0 +1,113 @@
+import json
+import os
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from settings import *
+
+
+class FrameProfiler:
+    # per subsystem frame timings and group sizes, F3 toggles the overlay, F4 dumps the recorded history
+    def __init__(self, groups, history=PROFILER_HISTORY):
+        self.screen = pygame.display.get_surface()
+        self.groups = groups
+        self.enabled = False
+
+        # ring buffer, the oldest frame falls out once it is full
+        self.history = deque(maxlen=history)
+        self.frame = {}
+        self.frame_start = 0
+
+        self.font = None
+        self.overlay = None
+        self.overlay_refresh = 15
+        # frames recorded so far, the history stops growing once it is full
+        self.frame_count = 0
+
+    def toggle(self):
+        self.enabled = not self.enabled
+        self.overlay = None
+
+    def begin_frame(self):
+        if self.enabled:
+            self.frame = {}
+            self.frame_start = time.perf_counter()
+
+    @contextmanager
+    def section(self, name):
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        yield
+        self.frame[name] = self.frame.get(name, 0) + (time.perf_counter() - start) * 1000
+
+    def update_sprites(self, group, dt):
+        # same as group.update(dt), but timed per sprite class, summed over the steps of a frame
+        # static sprites (walls) have nothing to update, each class is updated as one timed batch
+        start = time.perf_counter()
+        classes = {}
+        for sprite in group.sprites():
+            if not hasattr(sprite, 'static'):
+                classes.setdefault(type(sprite), []).append(sprite)
+        for sprite_class, sprites in classes.items():
+            class_start = time.perf_counter()
+            for sprite in sprites:
+                sprite.update(dt)
+            name = f'update {sprite_class.__name__}'
+            self.frame[name] = self.frame.get(name, 0) + (time.perf_counter() - class_start) * 1000
+        self.frame['update'] = self.frame.get('update', 0) + (time.perf_counter() - start) * 1000
+
+    def end_frame(self):
+        if not self.enabled:
+            return
+        self.frame['frame'] = (time.perf_counter() - self.frame_start) * 1000
+        self.history.append({
+            'timings': self.frame,
+            'counts': {name: len(group) for name, group in self.groups.items()}
+        })
+        self.frame_count += 1
+        # re-rendering the text every frame would show up in the numbers it displays
+        if self.overlay is None or self.frame_count % self.overlay_refresh == 0:
+            self.render_overlay()
+
+    def averages(self, frames=60):
+        recent = list(self.history)[-frames:]
+        totals = {}
+        for frame in recent:
+            for name, value in frame['timings'].items():
+                totals[name] = totals.get(name, 0) + value
+        return {name: value / len(recent) for name, value in totals.items()}
+
+    def render_overlay(self):
+        if self.font is None:
+            self.font = pygame.font.Font(None, 22)
+
+        averages = self.averages()
+        sections = ['frame', 'input', 'ai', 'update', 'chase', 'combat', 'spawn', 'draw', 'ui', 'display']
+        per_class = sorted(name for name in averages if name.startswith('update '))
+        lines = [(name, f'{averages[name]:.2f} ms') for name in sections + per_class if name in averages]
+        lines += [(name, str(count)) for name, count in self.history[-1]['counts'].items()]
+
+        width, line_height = 320, self.font.get_linesize()
+        self.overlay = pygame.Surface((width, line_height * len(lines) + 10), pygame.SRCALPHA)
+        self.overlay.fill((0, 0, 0, 170))
+        for index, (label, value) in enumerate(lines):
+            y = 5 + index * line_height
+            self.overlay.blit(self.font.render(label, True, 'white'), (8, y))
+            value_surf = self.font.render(value, True, 'white')
+            self.overlay.blit(value_surf, value_surf.get_frect(topright=(width - 8, y)))
+
+    def draw(self):
+        if self.enabled and self.overlay:
+            return self.screen.blit(self.overlay, self.overlay.get_frect(topright=(WINDOW_WIDTH - 10, 10)))
+
+    def dump(self):
+        # one json object per recorded frame
+        os.makedirs(PROFILER_DUMP_DIR, exist_ok=True)
+        path = join(PROFILER_DUMP_DIR, f'frames-{time.strftime("%Y%m%d-%H%M%S")}.jsonl')
+        with open(path, 'w') as file:
+            for frame in self.history:
+                file.write(json.dumps(frame) + '\n')
+        return path
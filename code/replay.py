@@ -0,0 +1,46 @@
+import struct
+
+from pygame import K_w, K_a, K_s, K_d, K_SPACE, K_f, K_e
+
+from player import ScriptedKeys
+
+# file: header (magic, version, seed, simulation step in seconds), then one byte per simulation step
+# the byte has a bit per key in RECORDED_KEYS, set when the key was held during that step
+RECORDED_KEYS = (K_w, K_a, K_s, K_d, K_SPACE, K_f, K_e)
+HEADER = struct.Struct('<4sBQd')
+MAGIC = b'DGRP'
+VERSION = 2
+
+
+class InputRecorder:
+    def __init__(self, path, seed, dt):
+        self.file = open(path, 'wb')
+        self.file.write(HEADER.pack(MAGIC, VERSION, seed, dt))
+
+    def record(self, pressed):
+        # returns the keys as a replay will read them back, the game plays the step with exactly those
+        mask = 0
+        for bit, key in enumerate(RECORDED_KEYS):
+            if pressed[key]:
+                mask |= 1 << bit
+        self.file.write(bytes((mask,)))
+        return unpack_keys(mask)
+
+    def close(self):
+        self.file.close()
+
+
+def unpack_keys(mask):
+    return ScriptedKeys(key for bit, key in enumerate(RECORDED_KEYS) if mask & 1 << bit)
+
+
+def load_recording(path):
+    # -> seed, step dt, [keys of every step]
+    with open(path, 'rb') as file:
+        data = file.read()
+    magic, version, seed, dt = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f'{path} is not a version {VERSION} recording')
+    # a byte's value is its key mask, every possible mask is unpacked once up front
+    keys = [unpack_keys(mask) for mask in range(1 << len(RECORDED_KEYS))]
+    return seed, dt, [keys[mask] for mask in data[HEADER.size:]]
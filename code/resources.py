@@ -0,0 +1,167 @@
+import argparse
+import io
+import json
+import mmap
+import os
+import struct
+
+from settings import *
+
+# every file under static is opened through here, named by its path inside static ('images/Heart/heart.png')
+# once a bundle is built (python resources.py) they all come out of that one memory mapped file,
+# so a launch opens one file instead of dozens, without one they are read from the static directory
+# a launch never looks at static while a bundle exists, python resources.py rebuilds it when something there changed
+
+# bundle: magic, version, entry count, then per entry its name length, offset and size followed by the name,
+#         then every file's bytes, each starting on a 16 byte boundary
+HEADER = struct.Struct('<4sBI')
+ENTRY = struct.Struct('<HQQ')
+MAGIC = b'DGAB'
+VERSION = 1
+# the bundle carries the map compiled, its sources are only needed to compile it
+COMPILED_MAP = 'data/map.bin'
+# name -> [size, mtime in ns] of every file under static when the bundle was built, read when it is rebuilt
+MANIFEST = 'bundle/manifest.json'
+
+
+class AssetBundle:
+    def __init__(self, path):
+        with open(path, 'rb') as file:
+            # copy on write, so a surface made from these bytes can never write into the file
+            self.data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_COPY)
+        magic, version, count = HEADER.unpack_from(self.data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f'{path} is not a version {VERSION} asset bundle')
+
+        # name -> (offset, size)
+        self.index = {}
+        offset = HEADER.size
+        for _ in range(count):
+            name_length, start, size = ENTRY.unpack_from(self.data, offset)
+            offset += ENTRY.size
+            self.index[self.data[offset:offset + name_length].decode()] = (start, size)
+            offset += name_length
+
+    def view(self, name):
+        start, size = self.index[name]
+        return memoryview(self.data)[start:start + size]
+
+    def close(self):
+        self.data.close()
+
+
+def open_bundle(path=BUNDLE_PATH):
+    try:
+        return AssetBundle(path)
+    except FileNotFoundError:
+        return None
+
+
+bundle = open_bundle()
+
+
+def asset_path(name):
+    # where the file lives on disk, for tools that want a real path
+    return join(STATIC_DIR, *name.split('/'))
+
+
+def read_asset(name):
+    if bundle and name in bundle.index:
+        return bundle.view(name)
+    with open(asset_path(name), 'rb') as file:
+        return file.read()
+
+
+def open_asset(name):
+    # a file object for loaders that take one: pygame.image.load, pygame.font.Font, pygame.mixer.Sound, json.load
+    return io.BytesIO(read_asset(name))
+
+
+def load_image(name):
+    # the name tells pygame the image format
+    return pygame.image.load(open_asset(name), name)
+
+
+def static_files():
+    # name -> path of every file under static
+    files = {}
+    for directory, _, file_names in sorted(os.walk(STATIC_DIR)):
+        for file_name in sorted(file_names):
+            file_path = join(directory, file_name)
+            files[os.path.relpath(file_path, STATIC_DIR).replace(os.sep, '/')] = file_path
+    return files
+
+
+def manifest():
+    stats = {name: os.stat(path) for name, path in static_files().items()}
+    return {name: [stat.st_size, stat.st_mtime_ns] for name, stat in stats.items()}
+
+
+def changed_files(path=BUNDLE_PATH):
+    # names under static added, removed or changed since the bundle was built, None without a bundle
+    built = open_bundle(path)
+    if built is None:
+        return None
+    packed = json.loads(bytes(built.view(MANIFEST))) if MANIFEST in built.index else {}
+    built.close()
+    current = manifest()
+    return sorted(name for name in packed.keys() | current.keys() if packed.get(name) != current.get(name))
+
+
+def build_bundle(path=BUNDLE_PATH):
+    from maps import compile_map
+
+    # name -> bytes of every file under static, the map sources swapped for the compiled map
+    map_sources = {os.path.abspath(source) for source in MAP_SOURCES}
+    contents = {}
+    for name, file_path in static_files().items():
+        if os.path.abspath(file_path) not in map_sources:
+            with open(file_path, 'rb') as file:
+                contents[name] = file.read()
+    contents[COMPILED_MAP] = compile_map()
+    contents[MANIFEST] = json.dumps(manifest()).encode()
+
+    names = [name.encode() for name in contents]
+    offset = HEADER.size + sum(ENTRY.size + len(name) for name in names)
+    # parts collected in order and joined once, instead of copying everything packed so far for every file
+    index = []
+    body = []
+    for name, data in zip(names, contents.values()):
+        padding = -offset % 16
+        body.append(bytes(padding))
+        offset += padding
+        index.append(ENTRY.pack(len(name), offset, len(data)) + name)
+        body.append(data)
+        offset += len(data)
+
+    with open(path + '.tmp', 'wb') as file:
+        file.write(HEADER.pack(MAGIC, VERSION, len(names)))
+        file.write(b''.join(index))
+        file.write(b''.join(body))
+    os.replace(path + '.tmp', path)
+    return contents
+
+
+if __name__ == '__main__':
+    # usage: python resources.py [--check] [--force], run again whenever something under static changes
+    parser = argparse.ArgumentParser(description='pack everything under static into one bundle')
+    parser.add_argument('--check', action='store_true', help='only list what changed since the bundle was built')
+    parser.add_argument('--force', action='store_true', help='build even if nothing under static changed')
+    args = parser.parse_args()
+
+    changed = changed_files()
+    if changed:
+        print(f'changed since the last build: {", ".join(changed)}')
+    if args.check or (changed == [] and not args.force):
+        print(f'{BUNDLE_PATH} is {"not built" if changed is None else "out of date" if changed else "up to date"}')
+        raise SystemExit(0 if changed == [] else 1)
+
+    # the new bundle replaces the file this process has mapped
+    if bundle:
+        bundle.close()
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    pygame.init()
+    # pytmx converts the tileset for the display while the map is compiled
+    pygame.display.set_mode((1, 1))
+    packed = build_bundle()
+    print(f'{len(packed)} files, {sum(len(data) for data in packed.values())} bytes packed into {BUNDLE_PATH}')
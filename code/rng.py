@@ -0,0 +1,12 @@
+import random
+
+# one random stream per subsystem, so rolling more often in one of them leaves the others untouched
+# seeded together from the game's seed, which recordings store to replay a session exactly
+spawn = random.Random()
+combat = random.Random()
+ai = random.Random()
+
+
+def seed_streams(seed):
+    for name, stream in (('spawn', spawn), ('combat', combat), ('ai', ai)):
+        stream.seed(f'{seed}:{name}')
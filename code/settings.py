@@ -1,6 +1,24 @@
 import pygame
-import pytmx
-from os.path import join
+from os.path import join, dirname, abspath
 
 WINDOW_WIDTH, WINDOW_HEIGHT = 1600, 900
 TILE_SIZE = 48
+CHUNK_SIZE = 16
+# everything is found from the project directory, whatever directory the game is started from
+ROOT_DIR = dirname(dirname(abspath(__file__)))
+STATIC_DIR = join(ROOT_DIR, 'static')
+BUNDLE_PATH = join(ROOT_DIR, 'static.bundle')
+ATLAS_CACHE_DIR = join(ROOT_DIR, 'cache', 'atlas')
+MAP_SOURCE = join(STATIC_DIR, 'data', 'map.tmx')
+MAP_SOURCES = (MAP_SOURCE, join(STATIC_DIR, 'data', 'dungeon_tiles.tsx'),
+               join(STATIC_DIR, 'data', 'DungeonCrawl_ProjectUtumnoTileset.png'))
+MAP_PATH = join(ROOT_DIR, 'cache', 'map.bin')
+SIMULATION_DT = 1 / 60
+PROFILER_HISTORY = 600
+PROFILER_DUMP_DIR = join(ROOT_DIR, 'profiles')
+SPAWN_BUDGET = 2
+SPAWN_STAGGER = 0
+FPS_CAP = 144
+MAX_SIMULATION_STEPS = 5
+AI_VIEW_MARGIN = 200
+AI_BACKGROUND_THINKS = 4
@@ -1,16 +1,12 @@
 import pygame.sprite
 
 
-class Sprite(pygame.sprite.Sprite):
-    def __init__(self, image, pos, groups):
-        super().__init__(groups)
-        self.image = image
-        self.rect = self.image.get_frect(topleft=pos)
-        self.ground = True
-
-
 class CollisionSprite(pygame.sprite.Sprite):
     def __init__(self, image, pos, groups):
-        super().__init__(groups)
+        super().__init__()
         self.image = image
         self.rect = self.image.get_frect(topleft=pos)
+        # never moves, so drawing has nothing to interpolate
+        self.static = True
+        # joined after the rect exists so the collision grid can index it
+        self.add(groups)
@@ -1,15 +1,154 @@
+import hashlib
+import os
+import struct
+import zlib
+
 import pygame
 
 from settings import *
+from resources import read_asset, load_image
+
+# frame -> its horizontally flipped twin, shared by every animated sprite
+flipped_frames = {}
+
+
+def flip_frame(frame, flip):
+    if not flip:
+        return frame
+    if frame not in flipped_frames:
+        flipped_frames[frame] = pygame.transform.flip(frame, True, False)
+    return flipped_frames[frame]
+
+
+# frame -> collision mask, so collide_mask never rebuilds a bitmask from an image
+frame_masks = {}
+
+
+def frame_mask(frame):
+    if frame not in frame_masks:
+        frame_masks[frame] = pygame.mask.from_surface(frame)
+    return frame_masks[frame]
+
+
+# frame -> white outline shown while a summoned skeleton is still asleep
+silhouette_frames = {}
+
+
+def silhouette(frame):
+    if frame not in silhouette_frames:
+        surf = pygame.mask.from_surface(frame).to_surface()
+        surf.set_colorkey('black')
+        silhouette_frames[frame] = surf
+    return silhouette_frames[frame]
+
+
+def clear_frame_caches():
+    # drops every cached twin and mask, for processes that load a fresh set of frames per game
+    flipped_frames.clear()
+    frame_masks.clear()
+    silhouette_frames.clear()
+
+
+def cache_frames(frames):
+    # flipped twin and mask of every frame, built once at load time
+    for frame in frames:
+        frame_mask(frame)
+        frame_mask(flip_frame(frame, True))
+
+
+def collide_mask(left, right):
+    # cheap rect test first, cached bitmasks only when the rects overlap
+    return left.rect.colliderect(right.rect) and pygame.sprite.collide_mask(left, right)
 
 
 # without multiple_files argument u provide path for one file and amount of rows
 # with multiple_files argument u can provide multiple files , and it merges it into one dictionary () - tuple with path and length
+# paths are asset names inside static, like 'images/Goblin/Run.png'
+# sliced frames are cached on disk, so only the first launch after an asset change pays for slicing and scaling
 
 def tile_importer(cols, rows, size, file_paths, multiple_files=False):
+    sources = file_paths if multiple_files else ((file_paths, rows),)
+    cache_path = atlas_cache_path(cols, rows, size, sources)
+
+    frames = load_atlas(cache_path)
+    if frames is None:
+        frames = slice_frames(cols, rows, size, file_paths, multiple_files)
+        save_atlas(cache_path, frames, multiple_files or rows != 1)
+    return frames
+
+
+def atlas_cache_path(cols, rows, size, sources):
+    # keyed by the source bytes and the slicing, so an edited sheet or a new size gets its own entry
+    digest = hashlib.sha1(f'{cols}x{rows}:{size[0]}x{size[1]}'.encode())
+    for path, length in sources:
+        digest.update(read_asset(path))
+        digest.update(str(length).encode())
+    return join(ATLAS_CACHE_DIR, f'{digest.hexdigest()}.atlas')
+
+
+# header: frame width, frame height, nested flag, row count, the length of every row, then every frame's bounding rect
+# body: zlib compressed BGRA pixels of just those bounding rects, most of every frame is transparent padding
+def save_atlas(path, frames, nested):
+    rows = frames if nested else [frames]
+    flat_frames = [frame for row in rows for frame in row]
+    width, height = flat_frames[0].size
+    rects = [frame.get_bounding_rect() for frame in flat_frames]
+
+    header = struct.pack('<HHBH', width, height, nested, len(rows))
+    header += struct.pack(f'<{len(rows)}H', *(len(row) for row in rows))
+    header += struct.pack(f'<{len(rects) * 4}H', *(value for rect in rects for value in rect))
+    pixels = b''.join(pygame.image.tobytes(frame.subsurface(rect), 'BGRA')
+                      for frame, rect in zip(flat_frames, rects) if rect.width and rect.height)
+
+    try:
+        os.makedirs(ATLAS_CACHE_DIR, exist_ok=True)
+        with open(path + '.tmp', 'wb') as file:
+            file.write(header + zlib.compress(pixels, 1))
+        os.replace(path + '.tmp', path)
+    except OSError:
+        # read-only install, just slice again next launch
+        pass
+
+
+def load_atlas(path):
+    try:
+        with open(path, 'rb') as file:
+            data = file.read()
+        width, height, nested, row_count = struct.unpack_from('<HHBH', data)
+        row_lengths = struct.unpack_from(f'<{row_count}H', data, 7)
+        frame_count = sum(row_lengths)
+        rects_offset = 7 + row_count * 2
+        rects = struct.unpack_from(f'<{frame_count * 4}H', data, rects_offset)
+        cropped = memoryview(zlib.decompress(data[rects_offset + frame_count * 8:]))
+    except (OSError, struct.error, zlib.error):
+        return None
+
+    # paste every cropped frame back into one tall transparent sheet
+    pixels = bytearray(width * height * 4 * frame_count)
+    offset = 0
+    for index in range(frame_count):
+        x, y, w, h = rects[index * 4:index * 4 + 4]
+        row_bytes = w * 4
+        start = ((index * height + y) * width + x) * 4
+        for row in range(h):
+            pixels[start + row * width * 4:start + row * width * 4 + row_bytes] = cropped[offset:offset + row_bytes]
+            offset += row_bytes
+    if offset != len(cropped):
+        return None
+    # BGRA matches convert_alpha's layout, so frombuffer needs no extra conversion
+    sheet = pygame.image.frombuffer(pixels, (width, height * frame_count), 'BGRA')
+
+    rows, index = [], 0
+    for length in row_lengths:
+        rows.append([sheet.subsurface(0, height * (index + col), width, height) for col in range(length)])
+        index += length
+    return rows if nested else rows[0]
+
+
+def slice_frames(cols, rows, size, file_paths, multiple_files=False):
     if not multiple_files:
         frames = []
-        surf = pygame.image.load(file_paths).convert_alpha()
+        surf = load_image(file_paths).convert_alpha()
         cutout_width = surf.width / cols
         cutout_height = surf.height / rows
         row_frames_1 = []
@@ -34,7 +173,7 @@ def tile_importer(cols, rows, size, file_paths, multiple_files=False):
         frames = []
         for path, length in file_paths:
             file_frames = []
-            surf = pygame.image.load(path).convert_alpha()
+            surf = load_image(path).convert_alpha()
             cutout_width = surf.width / length
             for col in range(cols):
                 cutout_surf = pygame.Surface((cutout_width, surf.height), pygame.SRCALPHA)
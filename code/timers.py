@@ -1,11 +1,88 @@
+import heapq
+from itertools import count
+
 from settings import *
 
+# time source of every timer, headless runs swap in a SimulatedClock
+clock = pygame.time.get_ticks
+
+
+def use_clock(source):
+    global clock
+    clock = source
+
+
+class SimulatedClock:
+    # milliseconds that only move when the simulation steps
+    def __init__(self):
+        self.ticks = 0
+
+    def __call__(self):
+        return self.ticks
+
+    def advance(self, dt):
+        self.ticks += dt * 1000
+
+
+class TimerScheduler:
+    # owned by the game, fires every timer from one heap when it is due instead of each timer polling itself
+    def __init__(self):
+        self.heap = []
+        self.order = count()
+        self.paused_at = None
+        self.paused_time = 0
+
+    def now(self):
+        if self.paused_at is not None:
+            return self.paused_at - self.paused_time
+        return clock() - self.paused_time
+
+    def schedule(self, timer):
+        heapq.heappush(self.heap, (timer.start_time + timer.duration, next(self.order), timer, timer.generation))
+
+    def pause(self):
+        if self.paused_at is None:
+            self.paused_at = clock()
+
+    def resume(self):
+        if self.paused_at is not None:
+            self.paused_time += clock() - self.paused_at
+            self.paused_at = None
+
+    def update(self):
+        if self.paused_at is not None:
+            return
+        now = self.now()
+        # timers re-armed by a callback wait for the next update, so a 0ms repeat can't spin forever
+        last_order = next(self.order)
+        while self.heap and self.heap[0][0] <= now and self.heap[0][1] < last_order:
+            _, _, timer, generation = heapq.heappop(self.heap)
+            # cancelled, paused or re-armed since this entry was pushed
+            if generation == timer.generation and timer.active and not timer.paused:
+                timer.fire()
+
+
+# the running game's scheduler, without one timers fall back to polling in update()
+scheduler = None
+
+
+def use_scheduler(timer_scheduler):
+    global scheduler
+    scheduler = timer_scheduler
+
+
+def now():
+    return scheduler.now() if scheduler else clock()
+
 
 class Timer:
     def __init__(self, duration, func=None, repeat=None, autostart=False):
         self.duration = duration
         self.start_time = 0
         self.active = False
+        self.paused = False
+        self.remaining = 0
+        self.generation = 0
         self.func = func
         self.repeat = repeat
         if autostart:
@@ -16,7 +93,11 @@ class Timer:
 
     def activate(self):
         self.active = True
-        self.start_time = pygame.time.get_ticks()
+        self.paused = False
+        self.start_time = now()
+        self.generation += 1
+        if scheduler:
+            scheduler.schedule(self)
 
     def deactivate(self):
         self.active = False
@@ -24,9 +105,33 @@ class Timer:
         if self.repeat:
             self.activate()
 
+    def cancel(self):
+        # unlike deactivate, a repeating timer stays stopped
+        self.active = False
+        self.paused = False
+        self.start_time = 0
+        self.generation += 1
+
+    def pause(self):
+        if self.active and not self.paused:
+            self.paused = True
+            self.remaining = self.start_time + self.duration - now()
+            self.generation += 1
+
+    def resume(self):
+        if self.paused:
+            self.paused = False
+            self.start_time = now() - (self.duration - self.remaining)
+            self.generation += 1
+            if scheduler:
+                scheduler.schedule(self)
+
+    def fire(self):
+        if self.func:
+            self.func()
+        self.deactivate()
+
     def update(self):
-        if self.active:
-            if pygame.time.get_ticks() >= self.start_time + self.duration:
-                if self.func:
-                    self.func()
-                self.deactivate()
+        if self.active and not self.paused and not scheduler:
+            if now() >= self.start_time + self.duration:
+                self.fire()
@@ -1,7 +1,10 @@
+from collections import OrderedDict
+
 import pygame.font
 from pygame import FRect, Vector2
 
 from settings import *
+from resources import open_asset, load_image
 
 
 class Ui:
@@ -13,25 +16,57 @@ class Ui:
         self.wave_multiplier = 0
         self.direction_up = True
         self.size = 31
+        self.pulse_height = 45
         self.play_the_animation = False
 
+        # resources, loaded once instead of every frame
+        self.avatar_image = self.load_image('images/Soldier/avatar.png', (110, 110))
+        self.heart_image = self.load_image('images/Heart/heart.png', (50, 50))
+        self.heart_border = self.load_image('images/Heart/border-charcoal.png', (50, 50))
+        self.font_name = 'fonts/UncialAntiqua-Regular.ttf'
+        self.fonts = {}
+        # (text, size, color) -> rendered surface, only re-rendered when the text changes
+        # least recently used first, past text_cache_size the oldest ones (old waves and levels) are dropped
+        self.texts = OrderedDict()
+        self.text_cache_size = 256
+        # how far the next wave's pulse sizes are pre-rendered
+        self.prerendered_wave = None
+        self.prerendered_sizes = 0
+        self.prerender_per_frame = 4
+
+    @staticmethod
+    def load_image(name, size):
+        return pygame.transform.scale(load_image(name).convert_alpha(), size)
+
+    def font(self, size):
+        if size not in self.fonts:
+            self.fonts[size] = pygame.font.Font(open_asset(self.font_name), size)
+        return self.fonts[size]
+
+    def text(self, content, size, color):
+        key = (content, size, color)
+        if key in self.texts:
+            self.texts.move_to_end(key)
+        else:
+            self.texts[key] = self.font(size).render(content, True, color)
+            if len(self.texts) > self.text_cache_size:
+                self.texts.popitem(last=False)
+        return self.texts[key]
+
     def menu(self):
         # stats
-        self.display_stats()
+        stats_rect = self.display_stats()
         # current wave
-        self.render_wave()
+        wave_rect = self.render_wave()
+        return [stats_rect, wave_rect]
 
     def display_stats(self):
         # profile
-        avatar_image = pygame.transform.scale(
-            pygame.image.load(join('..\\', 'static', 'images', 'Soldier', 'avatar.png')).convert_alpha(),
-            (110, 110))
-        avatar_rect = avatar_image.get_frect(topleft=self.container.topleft + Vector2(-13, -5))
-        self.screen.blit(avatar_image, avatar_rect)
+        avatar_rect = self.avatar_image.get_frect(topleft=self.container.topleft + Vector2(-13, -5))
+        self.screen.blit(self.avatar_image, avatar_rect)
 
         # level
-        level_font = pygame.font.Font(join('..\\', 'static', 'fonts', 'UncialAntiqua-Regular.ttf'), 22)
-        level_text = level_font.render(f"Level: {self.player.level}", True, '#90EE90')
+        level_text = self.text(f"Level: {self.player.level}", 22, '#90EE90')
         level_rect = level_text.get_frect(midright=self.container.midright + Vector2(-40, 10))
         self.screen.blit(level_text, level_rect)
 
@@ -54,25 +89,20 @@ class Ui:
         pygame.draw.rect(self.screen, inner_color, inner_border, 3, 7)
 
         # heart image
-        heart_image = pygame.transform.scale(
-            pygame.image.load(join('..\\', 'static', 'images', 'Heart', 'heart.png')).convert_alpha(), (50, 50))
         heart_offset = Vector2(-24, -10)
-        heart_rect = heart_image.get_frect(topleft=health_rect.topleft + heart_offset)
+        heart_rect = self.heart_image.get_frect(topleft=health_rect.topleft + heart_offset)
+        heart_border_rect = self.heart_border.get_frect(topleft=health_rect.topleft + heart_offset)
 
-        heart_border = pygame.transform.scale(
-            pygame.image.load(join('..\\', 'static', 'images', 'Heart', 'border-charcoal.png')).convert_alpha(),
-            (50, 50))
-        heart_border_rect = heart_border.get_frect(topleft=health_rect.topleft + heart_offset)
-
-        self.screen.blit(heart_image, heart_rect)
-        self.screen.blit(heart_border, heart_border_rect)
+        self.screen.blit(self.heart_image, heart_rect)
+        self.screen.blit(self.heart_border, heart_border_rect)
+        return avatar_rect.unionall([level_rect, health_rect, heart_rect, heart_border_rect])
 
     def render_wave(self):
         # its fucking hardcoded don't ask how it works
         if self.play_the_animation and self.direction_up:
             self.wave_multiplier += 1
 
-        if self.wave_multiplier == 45 and self.direction_up:
+        if self.wave_multiplier == self.pulse_height and self.direction_up:
             self.direction_up = False
 
         if not self.direction_up and self.wave_multiplier > 0:
@@ -81,11 +111,22 @@ class Ui:
         if self.wave_multiplier == 0 and not self.direction_up:
             self.wave_multiplier = 0
 
+        # the next wave's pulse sizes are rendered a few per frame while this one is on,
+        # so they are all cached when it starts instead of being rendered in one frame
+        if self.prerendered_wave != self.wave + 1:
+            self.prerendered_wave = self.wave + 1
+            self.prerendered_sizes = 0
+        if self.prerendered_sizes <= self.pulse_height:
+            last = min(self.prerendered_sizes + self.prerender_per_frame, self.pulse_height + 1)
+            for pulse in range(self.prerendered_sizes, last):
+                self.text(f"Wave: {self.prerendered_wave}", self.size + pulse, '#C4A000')
+            self.prerendered_sizes = last
+
         size = self.size + self.wave_multiplier
-        font = pygame.font.Font(join('..\\', 'static', 'fonts', 'UncialAntiqua-Regular.ttf'), size)
-        text = font.render(f"Wave: {self.wave}", True, '#C4A000')
+        text = self.text(f"Wave: {self.wave}", size, '#C4A000')
         text_rect = text.get_frect(center=(WINDOW_WIDTH / 2, 50))
-        self.screen.blit(text, text_rect)
+        return self.screen.blit(text, text_rect)
 
     def draw(self):
-        self.menu()
+        # the screen rects the hud covers this frame
+        return self.menu()
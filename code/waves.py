@@ -0,0 +1,38 @@
+import time
+from collections import deque
+
+from settings import *
+from timers import now
+
+
+class WaveDirector:
+    # every waves_info.json entry is compiled once into a spawn plan: (release time in ms, archetype)
+    # a started wave is released from a queue, a few spawns per frame, so a wave change never lands in one frame
+    def __init__(self, waves_data, archetypes, spawn, enemies, budget=SPAWN_BUDGET):
+        self.spawn = spawn
+        self.enemies = enemies
+        # ms a frame may spend spawning, None spawns one enemy per frame so seeded and replayed runs match
+        self.budget = budget
+
+        self.plans = []
+        for wave in waves_data:
+            # "stagger": seconds between two spawns of the wave, a wave can trickle in instead of appearing at once
+            stagger = wave.get('stagger', SPAWN_STAGGER) * 1000
+            self.plans.append([(index * stagger, archetypes[name]) for index, name in enumerate(wave['data'])])
+
+        self.queue = deque()
+        self.started_at = 0
+
+    def start(self, wave):
+        self.queue.extend(self.plans[wave - 1])
+        self.started_at = now()
+
+    def update(self):
+        elapsed = now() - self.started_at
+        start = time.perf_counter()
+        while self.queue and self.queue[0][0] <= elapsed:
+            release, archetype = self.queue.popleft()
+            self.enemies.add(self.spawn(archetype))
+
+            if self.budget is None or (time.perf_counter() - start) * 1000 >= self.budget:
+                break